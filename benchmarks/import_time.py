@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark for the charts-free startup path.
+
+Imports main.py in fresh interpreters, reports the best wall-clock time, and
+fails if the plotting stack is loaded at import time or the time exceeds the
+budget.
+
+Usage:
+    python benchmarks/import_time.py [--repeat N] [--budget SECONDS]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must only load when charts are actually rendered
+HEAVY_MODULES = ('matplotlib', 'seaborn', 'plotly')
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import main
+elapsed = time.perf_counter() - started
+heavy = sorted(name for name in sys.modules if name.split('.')[0] in {heavy!r})
+print(json.dumps({{'seconds': elapsed, 'heavy_modules': heavy}}))
+"""
+
+
+def measure_once() -> dict:
+    """Import main in a fresh interpreter and return its timing and loaded heavy modules"""
+    probe = PROBE.format(heavy=set(HEAVY_MODULES))
+    output = subprocess.run(
+        [sys.executable, '-c', probe], cwd=REPO_ROOT, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help='fresh interpreters to start')
+    parser.add_argument('--budget', type=float, default=2.0, help='maximum allowed import time in seconds')
+    args = parser.parse_args()
+
+    runs = [measure_once() for _ in range(args.repeat)]
+    heavy = sorted({name.split('.')[0] for run in runs for name in run['heavy_modules']})
+    result = {
+        'benchmark': 'import_main',
+        'best_seconds': min(run['seconds'] for run in runs),
+        'median_seconds': sorted(run['seconds'] for run in runs)[len(runs) // 2],
+        'budget_seconds': args.budget,
+        'heavy_modules_loaded': heavy,
+    }
+    print(json.dumps(result, indent=2))
+
+    if heavy:
+        print(f"FAIL: plotting modules imported at startup: {', '.join(heavy)}", file=sys.stderr)
+        sys.exit(1)
+    if result['best_seconds'] > args.budget:
+        print(f"FAIL: import took {result['best_seconds']:.2f}s (budget {args.budget:.2f}s)", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
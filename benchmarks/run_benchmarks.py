@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for every pipeline stage.
+
+Generates OpenWeatherMap-shaped payloads for N cities and times collection
+(against a local stub server), parsing, metrics, alerts, charts and both
+reports at each size. Results go to a JSON file that later runs can be
+compared against.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--sizes 10,1000,100000,1000000] [--stages ...]
+                                        [--repeat 3] [--output FILE] [--compare BASELINE]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import yaml  # noqa: E402
+
+from benchmarks.stub_server import StubWeatherServer  # noqa: E402
+from src.analyzer import CHARTS, WeatherAnalyzer  # noqa: E402
+from src.data_processor import WeatherDataProcessor  # noqa: E402
+from src.report_generator import ReportGenerator  # noqa: E402
+from src.synthetic import synthetic_cities, synthetic_current_weather, synthetic_forecast  # noqa: E402
+from src.weather_api import WeatherAPI  # noqa: E402
+
+SIZES = (10, 1_000, 100_000, 1_000_000)
+
+STAGES = (
+    'collect',
+    'process_current_weather',
+    'process_forecast',
+    'calculate_metrics',
+    'detect_weather_alerts',
+    *(f'chart:{name}' for name in CHARTS),
+    'html_report',
+    'json_report',
+)
+
+# Charts drawn with one matplotlib artist per city; the dashboard downsamples instead
+PER_CITY_CHARTS = ('chart:temperature_analysis', 'chart:comparative_analysis')
+
+CHART_OPTIONS = {
+    'weather_dashboard': {'plotlyjs': 'directory', 'webgl': True, 'max_points': 5000},
+    'temperature_analysis': {'dpi': 100},
+    'comparative_analysis': {'dpi': 100},
+}
+
+FORECAST_STEPS = 40
+
+
+def measure(stage: str, records: int, func: Callable, repeat: int,
+            cleanup: Optional[Callable] = None) -> Dict:
+    """Time func() `repeat` times with its console output suppressed"""
+    seconds = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            value = func()
+            seconds.append(time.perf_counter() - started)
+        if cleanup is not None:
+            cleanup(value)
+    best = min(seconds)
+    return {
+        'stage': stage,
+        'records': records,
+        'repeat': repeat,
+        'seconds': seconds,
+        'best_seconds': best,
+        'median_seconds': statistics.median(seconds),
+        'records_per_second': records / best if best > 0 else None,
+    }
+
+
+def skipped(stage: str, records: int, reason: str) -> Dict:
+    return {'stage': stage, 'records': records, 'skipped': reason}
+
+
+def remove_outputs(value):
+    """Delete files a stage wrote so large runs do not fill the disk"""
+    paths = value if isinstance(value, (list, tuple)) else [value]
+    for path in paths:
+        if isinstance(path, dict):
+            path = path.get('path')
+        if isinstance(path, str) and os.path.isfile(path):
+            os.remove(path)
+
+
+def bench_collect(records: int, workdir: str, repeat: int, latency: float) -> Dict:
+    """WeatherAPI.get_multiple_cities_weather against the local stub server"""
+    with StubWeatherServer(latency=latency) as server:
+        config = {
+            'api': {
+                'openweather_url': server.weather_url,
+                'forecast_url': server.forecast_url,
+                'api_key': 'stub',
+                'concurrent': True,
+                'rate_limit': {'requests_per_second': 1e6, 'burst': 1e6, 'max_in_flight': 32},
+                'retries': {'max_attempts': 1},
+                'collection': {'deadline': None, 'hedge_after': None},
+            },
+            'cities': [{'name': city['name'], 'lat': city['lat'], 'lon': city['lon']}
+                       for city in synthetic_cities(records)],
+            'data': {'cache': {'enabled': False}},
+        }
+        config_path = os.path.join(workdir, 'bench_config.yaml')
+        with open(config_path, 'w') as f:
+            yaml.safe_dump(config, f)
+
+        api = WeatherAPI(config_path)
+        result = measure('collect', records, api.get_multiple_cities_weather, repeat)
+        result['requests'] = server.requests
+        result['stub_latency'] = latency
+        return result
+
+
+def bench_size(records: int, stages: List[str], args, workdir: str) -> List[Dict]:
+    repeat = args.repeat if records <= args.large_threshold else args.large_repeat
+    output_path = os.path.join(workdir, 'reports')
+    results = []
+
+    if 'collect' in stages:
+        if records > args.max_collect_records:
+            results.append(skipped('collect', records, f"above --max-collect-records {args.max_collect_records}"))
+        else:
+            results.append(bench_collect(records, workdir, repeat, args.stub_latency))
+
+    started = time.perf_counter()
+    raw_data = synthetic_current_weather(records, seed=args.seed)
+    results.append({'stage': 'generate_current', 'records': records, 'repeat': 1,
+                    'best_seconds': time.perf_counter() - started})
+
+    processor = WeatherDataProcessor(os.path.join(workdir, 'data'), export_csv=False)
+    if 'process_current_weather' in stages:
+        results.append(measure('process_current_weather', records,
+                               lambda: processor.process_current_weather(raw_data), repeat))
+    df = processor.process_current_weather(raw_data)
+    del raw_data
+
+    metrics = processor.calculate_metrics(df)
+    alerts = processor.detect_weather_alerts(df)
+    if 'calculate_metrics' in stages:
+        results.append(measure('calculate_metrics', records, lambda: processor.calculate_metrics(df), repeat))
+    if 'detect_weather_alerts' in stages:
+        results.append(measure('detect_weather_alerts', records, lambda: processor.detect_weather_alerts(df), repeat))
+
+    analyzer = WeatherAnalyzer(output_path, CHART_OPTIONS)
+    for name in CHARTS:
+        stage = f'chart:{name}'
+        if stage not in stages:
+            continue
+        if stage in PER_CITY_CHARTS and records > args.max_chart_records:
+            results.append(skipped(stage, records, f"above --max-chart-records {args.max_chart_records}"))
+            continue
+        results.append(measure(stage, records, lambda name=name: analyzer.render_chart(name, df, metrics),
+                               repeat, cleanup=remove_outputs))
+
+    reporter = ReportGenerator(output_path)
+    if 'html_report' in stages:
+        results.append(measure('html_report', records, lambda: reporter.generate_html_report(df, metrics, alerts),
+                               repeat, cleanup=remove_outputs))
+    if 'json_report' in stages:
+        results.append(measure('json_report', records, lambda: reporter.generate_json_report(df, metrics, alerts),
+                               repeat, cleanup=remove_outputs))
+    del df
+
+    if 'process_forecast' in stages:
+        # Same number of rows: records / 40 cities with 40 three-hour steps each
+        cities = max(records // FORECAST_STEPS, 1)
+        forecasts = synthetic_forecast(cities, steps=min(FORECAST_STEPS, records), seed=args.seed)
+        results.append(measure('process_forecast', cities * min(FORECAST_STEPS, records),
+                               lambda: processor.process_forecast(forecasts), repeat))
+        del forecasts
+
+    return results
+
+
+def environment() -> Dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'argv': sys.argv[1:],
+    }
+
+
+def compare(results: List[Dict], baseline_path: str):
+    """Print best-time ratios against a previous results file"""
+    with open(baseline_path, 'r') as f:
+        baseline = {(entry['stage'], entry['records']): entry
+                    for entry in json.load(f)['results'] if 'best_seconds' in entry}
+
+    matched = [(entry, baseline[(entry['stage'], entry['records'])]) for entry in results
+               if 'best_seconds' in entry and (entry['stage'], entry['records']) in baseline]
+    if not matched:
+        print(f"\nNo stages/sizes in common with {baseline_path}")
+        return
+
+    print(f"\n{'stage':<30} {'records':>9} {'baseline s':>11} {'current s':>10} {'ratio':>7}")
+    for entry, before in matched:
+        ratio = entry['best_seconds'] / before['best_seconds'] if before['best_seconds'] else float('nan')
+        print(f"{entry['stage']:<30} {entry['records']:>9} {before['best_seconds']:>11.4f} "
+              f"{entry['best_seconds']:>10.4f} {ratio:>6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)), help='comma-separated record counts')
+    parser.add_argument('--stages', default=','.join(STAGES), help='comma-separated stages to run')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per stage')
+    parser.add_argument('--large-repeat', type=int, default=1, help='timed runs per stage above --large-threshold')
+    parser.add_argument('--large-threshold', type=int, default=10_000)
+    parser.add_argument('--max-chart-records', type=int, default=10_000,
+                        help='skip the per-city matplotlib charts above this many records')
+    parser.add_argument('--max-collect-records', type=int, default=1_000,
+                        help='skip collection (one HTTP request per city) above this many records')
+    parser.add_argument('--stub-latency', type=float, default=0.0, help='seconds the stub server adds per request')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='results file (default benchmarks/results/bench_<timestamp>.json)')
+    parser.add_argument('--compare', help='previous results file to compare against')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    stages = [stage for stage in args.stages.split(',') if stage]
+    unknown = sorted(set(stages) - set(STAGES))
+    if unknown:
+        parser.error(f"unknown stages {unknown}; choose from {', '.join(STAGES)}")
+
+    workdir = tempfile.mkdtemp(prefix='weather-bench-')
+    results = []
+    try:
+        for records in sizes:
+            print(f"Benchmarking {records:,} records...")
+            for entry in bench_size(records, stages, args, workdir):
+                results.append(entry)
+                if 'skipped' in entry:
+                    print(f"   - {entry['stage']}: skipped ({entry['skipped']})")
+                else:
+                    print(f"   ✓ {entry['stage']}: {entry['best_seconds']:.4f}s")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = args.output or os.path.join(REPO_ROOT, 'benchmarks', 'results',
+                                         f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'environment': environment(),
+            'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            'results': results,
+        }, f, indent=2)
+    print(f"Results written to: {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
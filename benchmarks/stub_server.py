@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OpenWeatherMap API.
+
+Serves /data/2.5/weather and /data/2.5/forecast with synthetic payloads for
+the requested coordinates, so WeatherAPI can be exercised without network
+access or an API key. Latency and an error rate can be injected.
+
+Usage:
+    python benchmarks/stub_server.py [--port 8080] [--latency 0.05] [--error-rate 0.01]
+
+then point api.openweather_url / api.forecast_url at the printed URLs.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.synthetic import synthetic_current_weather, synthetic_forecast  # noqa: E402
+
+WEATHER_PATH = '/data/2.5/weather'
+FORECAST_PATH = '/data/2.5/forecast'
+
+# Stations report on this cadence (seconds), so repeated polls see the same observation dt
+OBSERVATION_INTERVAL = 600
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real API behind a pooled session
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+        if server.latency:
+            time.sleep(server.latency)
+        with server.lock:
+            server.requests += 1
+            fail = server.error_rate and server.random.random() < server.error_rate
+        if fail:
+            return self._send(503, {'cod': 503, 'message': 'stub: injected failure'})
+        if url.path not in (WEATHER_PATH, FORECAST_PATH):
+            return self._send(404, {'cod': 404, 'message': 'stub: unknown endpoint'})
+
+        try:
+            city = self._city(query)
+        except ValueError as e:
+            return self._send(400, {'cod': 400, 'message': str(e)})
+
+        seed = zlib.crc32(city['name'].encode())
+        if url.path == WEATHER_PATH:
+            observed = datetime.fromtimestamp(time.time() // OBSERVATION_INTERVAL * OBSERVATION_INTERVAL)
+            payload = synthetic_current_weather(1, seed=seed, when=observed, cities=[city])[0]
+            payload['id'] = seed  # stable per-location city id, as the real API returns
+        else:
+            payload = synthetic_forecast(1, steps=int(query.get('cnt', 40)), seed=seed, cities=[city])[0]
+        payload.pop('city_config', None)
+        payload.pop('timestamp', None)
+        self._send(200, payload)
+
+    def _city(self, query):
+        if 'lat' in query and 'lon' in query:
+            lat, lon = float(query['lat']), float(query['lon'])
+            return {'name': f"Stub {lat:.4f},{lon:.4f}", 'lat': lat, 'lon': lon}
+        if 'q' in query:
+            return {'name': query['q'], 'lat': 0.0, 'lon': 0.0}
+        raise ValueError("stub: lat/lon or q required")
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubWeatherServer:
+    """OpenWeatherMap stand-in on localhost, run in a background thread
+
+    Use as a context manager; weather_url / forecast_url go into the api
+    section of the config in place of the real endpoints.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0,
+                 error_rate: float = 0.0, seed: int = 0):
+        self.httpd = ThreadingHTTPServer((host, port), _StubHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.latency = latency
+        self.httpd.error_rate = error_rate
+        self.httpd.random = random.Random(seed)
+        self.httpd.lock = threading.Lock()
+        self.httpd.requests = 0
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def weather_url(self) -> str:
+        return self.base_url + WEATHER_PATH
+
+    @property
+    def forecast_url(self) -> str:
+        return self.base_url + FORECAST_PATH
+
+    @property
+    def requests(self) -> int:
+        return self.httpd.requests
+
+    def start(self) -> 'StubWeatherServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='stub-weather-api', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> 'StubWeatherServer':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with 503')
+    args = parser.parse_args()
+
+    server = StubWeatherServer(args.host, args.port, args.latency, args.error_rate)
+    print(f"openweather_url: {server.weather_url}")
+    print(f"forecast_url: {server.forecast_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -5,121 +5,530 @@ Weather Data Analysis System
 Main execution script for real-time weather data collection, analysis, and reporting.
 """
 
-import schedule
+import copy
 import time
 import sys
 import os
+import traceback
+import pandas as pd
 from datetime import datetime
 from src.weather_api import WeatherAPI
 from src.data_processor import WeatherDataProcessor
-from src.analyzer import WeatherAnalyzer
+from src.artifact_cache import ArtifactCache
+from src.analyzer import CHARTS, WeatherAnalyzer
 from src.report_generator import ReportGenerator
+from src.pipeline import Pipeline, PipelineRun, SkipStage, StageResult
+from src.profiler import StageProfiler
+from src.scheduler import AlignedScheduler
+from src.sharding import ShardCoordinator
+from src.replay import ReplayRunner, discover_snapshots, load_snapshot
+from src.synthetic import synthetic_current_weather
 
 class WeatherAnalysisSystem:
     def __init__(self):
         self.api = WeatherAPI()
-        self.processor = WeatherDataProcessor()
-        self.analyzer = WeatherAnalyzer()
-        self.reporter = ReportGenerator()
+        self.telemetry = self.api.telemetry
+        # Metrics, alerts, charts and reports memoized by a fingerprint of their input
+        self.artifacts = ArtifactCache.from_config(self.api.config.get('data', {}))
+        self.processor = WeatherDataProcessor(
+            alert_rules=self.api.config.get('alerts', {}).get('rules'),
+            export_csv=self.api.config.get('data', {}).get('export_csv', True),
+            raw_archive=self.api.config.get('data', {}).get('raw_archive'),
+            telemetry=self.telemetry,
+            incremental=self.api.config.get('data', {}).get('incremental', False),
+            artifacts=self.artifacts
+        )
+        self.analyzer = WeatherAnalyzer(chart_options=self.api.config.get('reports', {}).get('charts'),
+                                        telemetry=self.telemetry, artifacts=self.artifacts)
+        report_config = self.api.config.get('reports', {})
+        self.reporter = ReportGenerator(
+            max_table_rows=report_config.get('max_table_rows'),
+            table_sort_by=report_config.get('table_sort_by', 'severity_score'),
+            page_size=report_config.get('page_size'),
+            json_mode=report_config.get('json_mode', 'pretty'),
+            telemetry=self.telemetry,
+            artifacts=self.artifacts
+        )
+        self.forecast_enabled = self.api.config.get('forecast', {}).get('enabled', False)
+        # Cities split across worker processes/nodes, each with its own API key; None when unsharded
+        self.sharding = ShardCoordinator.from_config(self.api.config, self.api.config_path)
+        self.last_raw_data = None
         
-    def run_analysis(self):
-        """Run complete weather analysis workflow"""
+    def run_analysis(self, charts: bool = True, raw_data=None):
+        """Run complete weather analysis workflow
+        
+        The run is a DAG of stages (see _build_pipeline): saving, charts and
+        reports overlap once their inputs exist, and a failing output stage does
+        not stop the others. With charts=False the visualization stages are left
+        out and the plotting libraries are never imported. Given raw_data, it is
+        analysed instead of collecting from the API.
+        """
         try:
             print(f"\n{'='*50}")
             print(f"Starting Weather Analysis: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
             print(f"{'='*50}")
             
-            # Step 1: Collect weather data
-            print("1. Collecting weather data...")
-            raw_data = self.api.get_multiple_cities_weather()
+            self.telemetry.reset()
+            
+            # Chart workers start only once a chart really renders (not on cache hits or skipped runs)
+            chart_pool = None
+            if charts and self.analyzer.chart_options.get('parallel', True):
+                chart_pool = self.analyzer.start_pool()
+            try:
+                # Stages overlap, so progress is one line per stage as it finishes
+                pipeline = Pipeline(on_done=self._print_progress)
+                run = self._build_pipeline(charts, chart_pool, raw_data=raw_data, pipeline=pipeline).run()
+            finally:
+                if chart_pool is not None:
+                    chart_pool.shutdown()
             
-            if not raw_data:
-                print("Error: No weather data collected")
+            self.telemetry.record_pipeline(run)
+            exported = self.telemetry.export()
+            if exported:
+                print(f"Run metrics written to: {', '.join(exported)}")
+            
+            # Summary of the finished run, step by step
+            print(f"Run summary ({run.elapsed:.1f}s):")
+            print("1. Data collection:")
+            if not run.ok('collect'):
+                print(f"Error: {run.results['collect'].error}")
                 return
+            raw_data = self.last_raw_data = run.value('collect')
             
             print(f"   ✓ Collected data for {len(raw_data)} cities")
+            shard_report = self.sharding.last_report if self.sharding is not None else None
+            if shard_report is not None:
+                print(f"   ✓ Shards: {len(shard_report.collected)}/{self.sharding.shards} merged "
+                      f"({', '.join(f'#{index}: {count}' for index, count in sorted(shard_report.collected.items()))})")
+                for index, error in sorted(shard_report.failed.items()):
+                    print(f"   ! Shard {index} failed: {error}")
+                if shard_report.missed_cities:
+                    print(f"   ! Missed by shards: {len(shard_report.missed_cities)} cities")
+            elif self.api.last_missed_cities:
+                print(f"   ! Missed collection deadline: {len(self.api.last_missed_cities)} cities")
+            cache_stats = self.api.cache_stats()
+            if cache_stats:
+                print(f"   ✓ Response cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
             
             # Step 2: Process data
-            print("2. Processing weather data...")
-            df = self.processor.process_current_weather(raw_data)
-            metrics = self.processor.calculate_metrics(df)
-            alerts = self.processor.detect_weather_alerts(df)
-            
-            print(f"   ✓ Processed {len(df)} weather records")
-            print(f"   ✓ Generated {len(alerts)} weather alerts")
+            print("2. Processing:")
+            # Incremental run with no new observation: the data-dependent stages were
+            # skipped, and the summary describes the unchanged latest observations
+            unchanged = 'update' in run.results and isinstance(run.results['update'].error, SkipStage)
+            if unchanged:
+                print(f"   - No changes since last run ({run.results['update'].error})")
+                df = self.processor.observations.snapshot
+                metrics, alerts = self.processor.calculate_metrics(df), self.processor.detect_weather_alerts(df)
+            else:
+                if 'update' in run.results and not self._print_stage(run, 'update'):
+                    return
+                if not self._print_stage(run, 'process'):
+                    return
+                df, metrics, alerts = run.value('process')
+                
+                if 'update' in run.results:
+                    update = run.value('update')
+                    print(f"   ✓ Processed {len(update.records)} new observations ({update.unchanged} unchanged)")
+                print(f"   ✓ Processed {len(df)} weather records")
+                print(f"   ✓ Generated {len(alerts)} weather alerts")
             
             # Step 3: Save raw and processed data
-            print("3. Saving data...")
-            self.processor.save_raw_data(raw_data)
-            self.processor.save_processed_data(df, metrics, alerts)
-            print("   ✓ Data saved successfully")
+            print("3. Storage:")
+            if unchanged:
+                if self._print_stage(run, 'save_raw'):
+                    print("   ✓ Raw data archived; no new observations to store")
+            elif self._print_stage(run, 'save_raw') & self._print_stage(run, 'save_processed'):
+                print("   ✓ Data saved successfully")
+            if 'save_forecast' in run.results and self._print_stage(run, 'save_forecast'):
+                cube = run.value('process_forecast')
+                print(f"   ✓ Forecast: {len(cube)} cities × {len(cube.times)} steps "
+                      f"({os.path.basename(run.value('save_forecast'))})")
             
             # Step 4: Generate visualizations
-            print("4. Creating visualizations...")
-            temp_chart = self.analyzer.create_temperature_analysis(df)
-            dashboard = self.analyzer.create_weather_dashboard(df, metrics)
-            comparison = self.analyzer.create_comparative_analysis(df)
-            
-            print(f"   ✓ Temperature analysis: {os.path.basename(temp_chart)}")
-            print(f"   ✓ Interactive dashboard: {os.path.basename(dashboard)}")
-            print(f"   ✓ Comparative analysis: {os.path.basename(comparison)}")
+            if unchanged:
+                print("4. Visualizations unchanged (no new observations)")
+            elif charts:
+                print("4. Visualizations:")
+                for label, name in (("Temperature analysis", 'temperature_analysis'),
+                                    ("Interactive dashboard", 'weather_dashboard'),
+                                    ("Comparative analysis", 'comparative_analysis')):
+                    if self._print_stage(run, f'chart:{name}'):
+                        chart = run.value(f'chart:{name}')
+                        reused = ", cached" if chart.get('cached') else ""
+                        print(f"   ✓ {label}: {os.path.basename(chart['path'])} ({chart['seconds']:.1f}s{reused})")
+            else:
+                print("4. Visualizations skipped (--no-charts)")
             
             # Step 5: Generate reports
-            print("5. Generating reports...")
-            html_report = self.reporter.generate_html_report(df, metrics, alerts)
-            json_report = self.reporter.generate_json_report(df, metrics, alerts)
-            
-            print(f"   ✓ HTML report: {os.path.basename(html_report)}")
-            print(f"   ✓ JSON report: {os.path.basename(json_report)}")
+            print("5. Reports:")
+            if unchanged:
+                print("   - Reports unchanged (no new observations)")
+            for label, kind in (("HTML report", 'html'), ("JSON report", 'json')):
+                if not unchanged and self._print_stage(run, f'{kind}_report'):
+                    reused = " (unchanged data, reused from an earlier run)" if self.reporter.reused.get(kind) else ""
+                    print(f"   ✓ {label}: {os.path.basename(run.value(f'{kind}_report'))}{reused}")
+            if self.artifacts.enabled:
+                artifact_stats = self.artifacts.stats()
+                print(f"   ✓ Artifact cache: {artifact_stats['hits']} hits, {artifact_stats['misses']} misses, "
+                      f"{artifact_stats['evictions']} evicted")
             
             # Step 6: Display summary
             print("6. Analysis Summary:")
             summary = self.reporter.generate_summary_text(metrics, alerts)
             print(summary)
             
+            critical_path = run.critical_path()
+            print("Critical path: " + " → ".join(f"{stage.name} ({stage.seconds:.1f}s)" for stage in critical_path)
+                  + f" — {run.elapsed:.1f}s total")
+            
             print(f"{'='*50}")
-            print("Weather analysis completed successfully!")
+            failed = run.failed()
+            if failed:
+                print(f"Weather analysis completed with {len(failed)} failed stage(s): "
+                      f"{', '.join(stage.name for stage in failed)}")
+            elif unchanged:
+                print("Weather analysis completed successfully (no changes since last run)")
+            else:
+                print("Weather analysis completed successfully!")
             print(f"{'='*50}\n")
             
         except Exception as e:
             print(f"Error during analysis: {e}")
-            import traceback
             traceback.print_exc()
     
-    def start_scheduled_analysis(self, interval_minutes: int = 30):
-        """Start scheduled weather analysis"""
-        print(f"Starting scheduled weather analysis (every {interval_minutes} minutes)")
-        print("Press Ctrl+C to stop")
+    def collect_weather(self, cities: list = None) -> list:
+        """Current weather for all cities, or the given subset, through the shards when sharded"""
+        if self.sharding is not None:
+            return self.sharding.collect(cities=cities)
+        return self.api.get_multiple_cities_weather(cities=cities)
+    
+    def _build_pipeline(self, charts: bool, chart_pool=None, raw_data=None,
+                        pipeline: Pipeline = None) -> Pipeline:
+        """Stages of one analysis run; 'process' yields (df, metrics, alerts) for the outputs
+        
+        Given raw_data, the collect stage returns it instead of calling the API.
+        """
+        def collect():
+            if raw_data is not None:
+                return raw_data
+            collected = self.collect_weather()
+            if not collected:
+                raise RuntimeError("No weather data collected")
+            return collected
+        
+        def process(raw_data):
+            df = self.processor.process_current_weather(raw_data)
+            return df, self.processor.calculate_metrics(df), self.processor.detect_weather_alerts(df)
+        
+        def update(raw_data):
+            update = self.processor.update_observations(raw_data)
+            if not update.changed:
+                raise SkipStage(f"no new observations for {update.unchanged} cities")
+            return update
+        
+        pipeline = pipeline or Pipeline()
+        pipeline.stage('collect', collect)
+        # Every collection is archived in full, so a replay sees the complete city set
+        pipeline.stage('save_raw', self.processor.save_raw_data, deps=('collect',))
+        if self.processor.incremental:
+            # Only payloads with a new (city id, dt) are parsed and stored; outputs are
+            # skipped entirely when nothing changed since the previous run
+            pipeline.stage('update', update, deps=('collect',))
+            pipeline.stage('process', lambda update: (update.snapshot,
+                                                      self.processor.calculate_metrics(update.snapshot),
+                                                      self.processor.detect_weather_alerts(update.snapshot)),
+                           deps=('update',))
+            pipeline.stage('save_processed',
+                           lambda processed, update: self.processor.save_processed_data(*processed, update.rows),
+                           deps=('process', 'update'))
+        else:
+            pipeline.stage('process', process, deps=('collect',))
+            pipeline.stage('save_processed', lambda processed: self.processor.save_processed_data(*processed),
+                           deps=('process',))
+        if charts:
+            for name in CHARTS:
+                pipeline.stage(f'chart:{name}',
+                               lambda processed, name=name: self.analyzer.render_chart(
+                                   name, processed[0], processed[1], chart_pool),
+                               deps=('process',))
+        if self.forecast_enabled and raw_data is None:
+            # Independent branch: forecasts are fetched and stored alongside current weather
+            pipeline.stage('collect_forecast', self.api.get_multiple_cities_forecast)
+            pipeline.stage('process_forecast', self.processor.process_forecast_cube, deps=('collect_forecast',))
+            pipeline.stage('save_forecast', self.processor.save_forecast, deps=('process_forecast',))
+        pipeline.stage('html_report', lambda processed: self.reporter.generate_html_report(*processed),
+                       deps=('process',))
+        pipeline.stage('json_report', lambda processed: self.reporter.generate_json_report(*processed),
+                       deps=('process',))
+        return pipeline
+    
+    @staticmethod
+    def _print_progress(result: StageResult):
+        """Progress line for a stage that just finished; the run summary follows at the end"""
+        print(f"   [{result.finished:5.1f}s] {result.name}: {result.status}")
+    
+    @staticmethod
+    def _print_stage(run: PipelineRun, name: str) -> bool:
+        """Print a failed or skipped stage with its error; True when the stage succeeded"""
+        result = run.results[name]
+        if result.status == 'failed':
+            print(f"   ✗ {name} failed: {result.error}")
+            traceback.print_exception(type(result.error), result.error, result.error.__traceback__)
+        elif isinstance(result.error, SkipStage):
+            print(f"   - {name} skipped ({result.error})")
+        elif result.status == 'skipped':
+            print(f"   ✗ {name} skipped (an upstream stage failed)")
+        return result.status == 'ok'
+    
+    def run_profile(self, source: str = "synthetic", records: int = 1000, top: int = 25,
+                    charts: bool = True):
+        """Profile one offline analysis run stage by stage
+        
+        source is 'synthetic' (records generated cities), 'recorded' (the newest
+        raw snapshot) or a path to a snapshot file. Stages run one at a time with
+        charts rendered in-process, and every output, profiles included, goes
+        to reports/profile_<timestamp>/ instead of the data directory.
+        """
+        if source == "synthetic":
+            raw_data = synthetic_current_weather(records)
+        else:
+            if source == "recorded":
+                snapshots = discover_snapshots(self.processor.raw_path)
+                if not snapshots:
+                    print("No recorded snapshots found; use 'synthetic' or a snapshot path")
+                    return
+                source = snapshots[-1][1]
+            raw_data = load_snapshot(source)
+        
+        profile_path = os.path.join(self.reporter.output_path,
+                                    f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        profiler = StageProfiler(profile_path, top=top)
+        
+        # Same stages and settings, with outputs redirected to the profile directory;
+        # a disabled artifact cache so every stage really runs
+        profiled = copy.copy(self)
+        profiled.artifacts = ArtifactCache()
+        profiled.processor = WeatherDataProcessor(
+            data_path=os.path.join(profile_path, "data"),
+            alert_rules=self.api.config.get('alerts', {}).get('rules'),
+            export_csv=self.processor.export_csv,
+            raw_archive=self.api.config.get('data', {}).get('raw_archive'),
+            artifacts=profiled.artifacts
+        )
+        profiled.analyzer = WeatherAnalyzer(profile_path, self.analyzer.chart_options, artifacts=profiled.artifacts)
+        profiled.reporter = ReportGenerator(
+            output_path=profile_path,
+            max_table_rows=self.reporter.max_table_rows,
+            table_sort_by=self.reporter.table_sort_by,
+            page_size=self.reporter.page_size,
+            json_mode=self.reporter.json_mode,
+            telemetry=profiled.processor.telemetry,
+            artifacts=profiled.artifacts
+        )
+        
+        print(f"Profiling analysis of {len(raw_data)} records from {source}...")
+        pipeline = Pipeline(max_workers=1, around=profiler.stage)
+        run = profiled._build_pipeline(charts, raw_data=raw_data, pipeline=pipeline).run()
+        paths = profiler.write()
+        
+        for name, stage in sorted(profiler.stages.items(), key=lambda item: item[1]['wall_seconds'], reverse=True):
+            status = "✓" if run.ok(name) else "✗"
+            print(f"   {status} {name}: {stage['wall_seconds']:.2f}s wall, {stage['cpu_seconds']:.2f}s CPU, "
+                  f"peak {stage['peak_bytes'] / 2**20:.1f} MiB")
+        for result in run.failed():
+            print(f"   ✗ {result.name} failed: {result.error}")
+        print("Hottest functions:")
+        for hot in profiler.hot_functions()[:5]:
+            print(f"   {hot['own_seconds']:.3f}s  {hot['function']}")
+        print(f"Profile summary: {paths['text']}")
+    
+    def run_forecast(self, hours: float = 24, top: int = 10):
+        """Fetch and store forecasts for all cities, then summarise the next `hours`"""
+        print(f"Fetching forecasts for {len(self.api.config['cities'])} cities...")
+        raw_forecasts = self.api.get_multiple_cities_forecast()
+        if not raw_forecasts:
+            print("Error: No forecast data collected")
+            return
         
-        # Schedule the analysis
-        schedule.every(interval_minutes).minutes.do(self.run_analysis)
+        cube = self.processor.process_forecast_cube(raw_forecasts)
+        self.processor.save_forecast(cube)
         
-        # Run once immediately
-        self.run_analysis()
+        summary = pd.concat([
+            cube.aggregate('wind_speed', 'max', hours),
+            cube.aggregate('temperature', 'max', hours),
+            cube.aggregate('temperature', 'min', hours),
+            cube.aggregate('precipitation_probability', 'max', hours),
+        ], axis=1).sort_values('max_wind_speed', ascending=False)
+        
+        print(f"Next {hours:g}h, windiest {min(top, len(summary))} of {len(summary)} cities:")
+        for city, row in summary.head(top).iterrows():
+            print(f"   {city}: wind up to {row['max_wind_speed']:.1f} m/s, "
+                  f"{row['min_temperature']:.1f}–{row['max_temperature']:.1f}°C, "
+                  f"rain chance {row['max_precipitation_probability']:.0%}")
+    
+    def run_nearby(self, center: str, radius_km: float = 200, charts: bool = True):
+        """Run the analysis once on the cities within radius_km of a catalog city or "lat,lon" """
+        catalog = self.api.city_catalog()
+        if ',' in center:
+            lat, lon = (float(value) for value in center.split(','))
+        else:
+            index = catalog.find(center)
+            if index is None:
+                print(f"Error: {center} is not in the city catalog")
+                return
+            lat, lon = float(catalog.lat[index]), float(catalog.lon[index])
+        
+        indices, distances = catalog.within_radius(lat, lon, radius_km)
+        if not len(indices):
+            print(f"No cities within {radius_km:g} km of {center}")
+            return
+        print(f"{len(indices)} of {len(catalog)} cities within {radius_km:g} km of {center} "
+              f"(farthest {distances[-1]:.0f} km)")
+        raw_data = self.collect_weather(cities=catalog.to_configs(indices))
+        if not raw_data:
+            print("Error: No weather data collected")
+            return
+        self.run_analysis(charts=charts, raw_data=raw_data)
+    
+    def run_replay(self, start: str = None, end: str = None):
+        """Reprocess archived raw data offline, one worker process per day"""
+        start_time = datetime.strptime(start, '%Y-%m-%d') if start else None
+        end_time = datetime.strptime(end, '%Y-%m-%d') if end else None
+        
+        runner = ReplayRunner(
+            self.processor.data_path,
+            alert_rules=self.api.config.get('alerts', {}).get('rules'),
+            workers=self.api.config.get('replay', {}).get('workers'),
+            incremental=self.processor.incremental
+        )
+        
+        print(f"Replaying archived weather data ({runner.workers} workers)...")
+        started = time.perf_counter()
+        results = runner.run(start_time, end_time)
+        elapsed = time.perf_counter() - started
+        
+        if not results:
+            print("No archived snapshots found to replay")
+            return
+        
+        for result in results:
+            print(f"   ✓ {result['date']}: {result['snapshots']} snapshots, "
+                  f"{result['records']} records, {result['alerts']} alerts ({result['seconds']:.1f}s)")
+        
+        total_records = sum(result['records'] for result in results)
+        print(f"Replayed {total_records} records from {len(results)} days in {elapsed:.1f}s "
+              f"({total_records / elapsed:.0f} records/s)")
+        added = sum(result['added'] for result in results)
+        print(f"Backfilled {added} missing runs into: {self.processor.history.root}")
+    
+    def start_scheduled_analysis(self, interval_minutes: int = 30, charts: bool = True):
+        """Start scheduled weather analysis on wall-clock-aligned ticks
+        
+        Runs never overlap; ticks missed by a long run are skipped or coalesced
+        per schedule.overlap. With schedule.stagger_slots > 1 the interval is
+        split into that many slots, each refreshing its share of the cities, and
+        the analysis runs once per interval (in the last slot) on the latest
+        observation of every city, spreading API calls over the interval.
+        """
+        schedule_config = self.api.config.get('schedule', {})
+        slots = max(1, int(schedule_config.get('stagger_slots', 1)))
+        cities = self.api.config['cities']
+        groups = [cities[slot::slots] for slot in range(slots)]
+        latest = {}
+        
+        def cycle(tick: float):
+            if slots == 1:
+                self.run_analysis(charts=charts)
+            else:
+                slot = scheduler.tick_index(tick) % slots
+                for data in self.collect_weather(cities=groups[slot]):
+                    latest[data['city_config']['name']] = data
+                print(f"Refreshed {len(groups[slot])} cities (slot {slot + 1}/{slots})")
+                if slot == slots - 1:
+                    self.run_analysis(charts=charts, raw_data=list(latest.values()))
+            self._print_next_tick(scheduler)
+        
+        scheduler = AlignedScheduler(
+            cycle,
+            interval=interval_minutes * 60 / slots,
+            offset=schedule_config.get('offset_seconds', 0),
+            overlap=schedule_config.get('overlap', 'skip')
+        )
+        
+        print(f"Starting scheduled weather analysis (every {interval_minutes} minutes"
+              + (f", cities refreshed in {slots} staggered slots" if slots > 1 else "") + ")")
+        print("Press Ctrl+C to stop")
+        
+        # Run once immediately; this also seeds the staggered observations
+        self.run_analysis(charts=charts)
+        for data in self.last_raw_data or []:
+            latest[data.get('city_config', {}).get('name', data.get('name'))] = data
+        self._print_next_tick(scheduler)
         
-        # Keep running
         try:
-            while True:
-                schedule.run_pending()
-                time.sleep(1)
+            scheduler.run()
         except KeyboardInterrupt:
-            print("\nScheduled analysis stopped by user")
+            stats = scheduler.stats
+            print(f"\nScheduled analysis stopped by user ({stats.runs} runs, {stats.failures} failed, "
+                  f"{stats.skipped} ticks skipped, {stats.coalesced} coalesced)")
+    
+    @staticmethod
+    def _print_next_tick(scheduler: AlignedScheduler):
+        stats = scheduler.stats
+        next_tick = datetime.fromtimestamp(scheduler.next_tick()).strftime('%H:%M:%S')
+        print(f"Next run at {next_tick} (skipped {stats.skipped}, coalesced {stats.coalesced} ticks so far)")
 
 def main():
     """Main function with command line interface"""
     system = WeatherAnalysisSystem()
     
-    if len(sys.argv) > 1:
-        command = sys.argv[1].lower()
+    # --no-charts skips visualizations and never imports matplotlib/plotly
+    charts = "--no-charts" not in sys.argv
+    args = [arg for arg in sys.argv[1:] if arg != "--no-charts"]
+    
+    if args:
+        command = args[0].lower()
         
         if command == "run":
             # Run analysis once
-            system.run_analysis()
+            system.run_analysis(charts=charts)
             
         elif command == "schedule":
             # Run scheduled analysis
-            interval = int(sys.argv[2]) if len(sys.argv) > 2 else 30
-            system.start_scheduled_analysis(interval)
+            interval = int(args[1]) if len(args) > 1 else 30
+            system.start_scheduled_analysis(interval, charts=charts)
+            
+        elif command == "forecast":
+            # Fetch, store and summarise forecasts
+            hours = float(args[1]) if len(args) > 1 else 24
+            system.run_forecast(hours)
+            
+        elif command == "profile":
+            # Profile one offline run on synthetic or recorded data
+            source = args[1] if len(args) > 1 else "synthetic"
+            records = int(args[2]) if len(args) > 2 else 1000
+            system.run_profile(source, records, charts=charts)
+            
+        elif command == "replay":
+            # Reprocess archived raw data, optionally limited to [start, end)
+            start = args[1] if len(args) > 1 else None
+            end = args[2] if len(args) > 2 else None
+            system.run_replay(start, end)
+            
+        elif command == "near":
+            # Run analysis on the cities around a catalog city or coordinates
+            if len(args) < 2:
+                print("Usage: python main.py near <city|lat,lon> [radius_km]")
+            else:
+                radius = float(args[2]) if len(args) > 2 else 200
+                system.run_nearby(args[1], radius, charts=charts)
+            
+        elif command == "shard":
+            # Collect one shard into the shared directory (a worker node in sharded mode)
+            if system.sharding is None or len(args) < 2:
+                print("Usage: python main.py shard <index> (requires sharding.shards > 1 in config)")
+            else:
+                print(f"Shard output written to: {system.sharding.collect_worker(int(args[1]))}")
             
         elif command == "help":
             print("""
@@ -128,19 +537,33 @@ Weather Data Analysis System
 Usage:
     python main.py run              - Run analysis once
     python main.py schedule [min]   - Run scheduled analysis (default: 30 min)
+    python main.py replay [start] [end] - Reprocess archived raw data, backfilling missing runs (dates as YYYY-MM-DD)
+    python main.py forecast [hours]  - Fetch and store forecasts, summarise the next hours (default: 24)
+    python main.py profile [source] [n] - Profile one offline run; source is synthetic (n cities),
+                                      recorded (newest raw snapshot) or a snapshot path
+    python main.py near <city|lat,lon> [km] - Run analysis on the cities within km (default: 200)
+    python main.py shard <index>    - Collect one shard of the cities (worker node, sharding.mode: shared)
     python main.py help            - Show this help message
 
+Options:
+    --no-charts                     - Skip visualizations (run/schedule/profile); plotting libraries are not loaded
+
 Examples:
     python main.py run
     python main.py schedule 15
+    python main.py run --no-charts
     python main.py schedule
+    python main.py replay 2024-01-01 2024-02-01
+    python main.py forecast 48
+    python main.py profile synthetic 10000
+    python main.py near London 200
             """)
         else:
             print(f"Unknown command: {command}")
             print("Use 'python main.py help' for usage information")
     else:
         # Default: run once
-        system.run_analysis()
+        system.run_analysis(charts=charts)
 
 if __name__ == "__main__":
     main()
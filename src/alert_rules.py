@@ -0,0 +1,126 @@
+import operator
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+OPERATORS = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+
+# Built-in rules, matching the thresholds the processor has always used
+DEFAULT_ALERT_RULES = [
+    {'type': 'EXTREME_HEAT', 'column': 'temperature', 'op': '>', 'threshold': 40,
+     'severity': 'high', 'message': "Extreme heat warning: {value:.1f}°C"},
+    {'type': 'EXTREME_COLD', 'column': 'temperature', 'op': '<', 'threshold': -20,
+     'severity': 'high', 'message': "Extreme cold warning: {value:.1f}°C"},
+    {'type': 'HIGH_WIND', 'column': 'wind_speed', 'op': '>', 'threshold': 20,
+     'severity': 'medium', 'message': "High wind warning: {value:.1f} m/s"},
+    {'type': 'HIGH_HUMIDITY', 'column': 'humidity', 'op': '>', 'threshold': 90,
+     'severity': 'low', 'message': "High humidity: {value}%"},
+]
+
+
+@dataclass
+class AlertRule:
+    """A threshold comparison on one column, with optional per-country thresholds"""
+    type: str
+    column: str
+    op: str
+    threshold: float
+    message: str
+    severity: str = 'medium'
+    overrides: Dict[str, float] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if self.op not in OPERATORS:
+            raise ValueError(f"Unknown operator {self.op!r} in alert rule {self.type}")
+        self.compare = OPERATORS[self.op]
+
+    @classmethod
+    def from_dict(cls, config: Dict) -> "AlertRule":
+        return cls(
+            type=config['type'],
+            column=config['column'],
+            op=config.get('op', '>'),
+            threshold=config['threshold'],
+            message=config.get('message', config['type'] + ": {value}"),
+            severity=config.get('severity', 'medium'),
+            overrides=dict(config.get('overrides') or {}),
+        )
+
+
+class AlertRuleEngine:
+    """Evaluate alert rules as boolean masks over whole DataFrame columns"""
+
+    def __init__(self, rules: Optional[List[Dict]] = None, country_column: str = 'country'):
+        # An explicit empty list disables alerts; only a missing rules setting falls back
+        self.rules = [AlertRule.from_dict(rule) for rule in (DEFAULT_ALERT_RULES if rules is None else rules)]
+        self.country_column = country_column
+
+    def evaluate(self, df: pd.DataFrame) -> List[Dict]:
+        """Return alert records for every (row, rule) match, ordered by row then rule"""
+        if df.empty:
+            return []
+
+        country_codes = None
+        countries = None
+        if self.country_column in df.columns and any(rule.overrides for rule in self.rules):
+            country_codes, countries = pd.factorize(df[self.country_column])
+
+        column_cache = {}
+        hit_rows = []
+        hit_rules = []
+        for rule_index, rule in enumerate(self.rules):
+            if rule.column not in df.columns:
+                continue
+            if rule.column not in column_cache:
+                column_cache[rule.column] = df[rule.column].to_numpy()
+            values = column_cache[rule.column]
+
+            threshold = self._thresholds(rule, country_codes, countries)
+            with np.errstate(invalid='ignore'):
+                mask = rule.compare(values, threshold)
+            rows = np.flatnonzero(mask)
+            if len(rows):
+                hit_rows.append(rows)
+                hit_rules.append(np.full(len(rows), rule_index))
+
+        if not hit_rows:
+            return []
+
+        rows = np.concatenate(hit_rows)
+        rule_indices = np.concatenate(hit_rules)
+        order = np.lexsort((rule_indices, rows))
+        rows = rows[order]
+        rule_indices = rule_indices[order]
+
+        # Materialise alert records only for matching rows
+        cities = df['city'].to_numpy()[rows].tolist()
+        alerts = []
+        for row, rule_index, city in zip(rows.tolist(), rule_indices.tolist(), cities):
+            rule = self.rules[rule_index]
+            value = column_cache[rule.column][row].item()
+            alerts.append({
+                'city': city,
+                'type': rule.type,
+                'value': value,
+                'message': rule.message.format(value=value, city=city, threshold=rule.threshold),
+                'severity': rule.severity,
+            })
+        return alerts
+
+    def _thresholds(self, rule: AlertRule, country_codes: Optional[np.ndarray], countries):
+        """Return a scalar threshold, or a per-row array when country overrides apply"""
+        if not rule.overrides or country_codes is None:
+            return rule.threshold
+        lookup = np.array([rule.overrides.get(country, rule.threshold) for country in countries],
+                          dtype=np.float64)
+        # factorize marks missing countries as -1; give them the default threshold
+        lookup = np.append(lookup, rule.threshold)
+        return lookup[country_codes]
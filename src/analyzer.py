@@ -1,26 +1,119 @@
 ```python
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
+import multiprocessing
 import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+from src.artifact_cache import ArtifactCache
+from src.indices import comfort_index, weather_severity
+from src.telemetry import Telemetry
 
-class WeatherAnalyzer:
-    def __init__(self, output_path: str = "reports/"):
-        self.output_path = output_path
-        os.makedirs(output_path, exist_ok=True)
+_pyplot_module = None
+_inline_render_lock = threading.Lock()  # pyplot state is global; one inline render at a time
+
+
+def _pyplot():
+    """Import and style matplotlib on first use so startup never pays for the plotting stack"""
+    global _pyplot_module
+    if _pyplot_module is None:
+        import matplotlib
+        matplotlib.use('Agg')  # Non-interactive backend; charts are only written to files
+        import matplotlib.pyplot as plt
+        import seaborn as sns
         
         # Set style for matplotlib
         plt.style.use('seaborn-v0_8')
         sns.set_palette("husl")
+        _pyplot_module = plt
+    return _pyplot_module
+
+
+# Chart name -> (WeatherAnalyzer method, whether it takes metrics)
+CHARTS = {
+    'temperature_analysis': ('create_temperature_analysis', False),
+    'weather_dashboard': ('create_weather_dashboard', True),
+    'comparative_analysis': ('create_comparative_analysis', False),
+}
+
+
+def _render_chart(output_path: str, chart_options: Dict, name: str, df: pd.DataFrame, metrics: Dict) -> Dict:
+    """Render one chart in a worker process, returning its path and wall-clock time"""
+    started = time.perf_counter()
+    analyzer = WeatherAnalyzer(output_path, chart_options)
+    method, needs_metrics = CHARTS[name]
+    args = (df, metrics) if needs_metrics else (df,)
+    filepath = getattr(analyzer, method)(*args)
+    return {'path': filepath, 'seconds': time.perf_counter() - started}
+
+
+class ChartPool:
+    """Chart worker processes, started when the first chart actually renders
+
+    Runs whose charts all come from the artifact cache, or that skip the
+    charts altogether, never start a process. The first submit usually comes
+    from a pipeline thread, so workers are forked from a fork server that
+    has this module preloaded (spawned where that is unavailable), never
+    from the threaded caller itself.
+    """
+    
+    def __init__(self, workers: int = len(CHARTS)):
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def started(self) -> bool:
+        return self._executor is not None
+    
+    def submit(self, fn, *args) -> Future:
+        with self._lock:
+            if self._executor is None:
+                if 'forkserver' in multiprocessing.get_all_start_methods():
+                    context = multiprocessing.get_context('forkserver')
+                    context.set_forkserver_preload([__name__])
+                else:
+                    context = multiprocessing.get_context('spawn')
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+            return self._executor.submit(fn, *args)
+    
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+
+def _downsample(df: pd.DataFrame, column: str, max_points: Optional[int]) -> pd.DataFrame:
+    """Rows at evenly spaced ranks of `column`, keeping the extremes, when df exceeds max_points"""
+    if not max_points or len(df) <= max_points:
+        return df
+    order = np.argsort(df[column].to_numpy(dtype=float), kind='stable')
+    picks = np.unique(np.linspace(0, len(order) - 1, int(max_points)).round().astype(np.int64))
+    return df.iloc[np.sort(order[picks])]
+
+
+def _sampled_title(title: str, sample: pd.DataFrame, df: pd.DataFrame) -> str:
+    if len(sample) == len(df):
+        return title
+    return f"{title} ({len(sample):,} of {len(df):,} cities)"
+
+
+class WeatherAnalyzer:
+    def __init__(self, output_path: str = "reports/", chart_options: Optional[Dict] = None,
+                 telemetry: Optional[Telemetry] = None, artifacts: Optional[ArtifactCache] = None):
+        self.output_path = output_path
+        self.chart_options = chart_options or {}
+        self.telemetry = telemetry or Telemetry()
+        self.artifacts = artifacts or ArtifactCache()
+        os.makedirs(output_path, exist_ok=True)
     
     def create_temperature_analysis(self, df: pd.DataFrame) -> str:
         """Create temperature analysis visualizations"""
+        plt = _pyplot()
         fig, axes = plt.subplots(2, 2, figsize=(15, 12))
         
         # Temperature distribution
@@ -52,20 +145,33 @@ class WeatherAnalyzer:
         
         plt.tight_layout()
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"temperature_analysis_{timestamp}.png"
-        filepath = os.path.join(self.output_path, filename)
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        return filepath
+        return self._save_figure(fig, 'temperature_analysis')
     
     def create_weather_dashboard(self, df: pd.DataFrame, metrics: Dict) -> str:
-        """Create an interactive weather dashboard using Plotly"""
+        """Create an interactive weather dashboard using Plotly
+        
+        Options (reports.charts.weather_dashboard): plotlyjs ('inline', 'directory'
+        for one shared plotly.min.js next to the dashboards, or 'cdn'), webgl
+        (WebGL scatter traces) and max_points (per-trace point budget above which
+        city series are downsampled and the histogram is pre-binned).
+        """
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
+        
+        options = self.chart_options.get('weather_dashboard', {})
+        max_points = options.get('max_points')
+        scatter_trace = go.Scattergl if options.get('webgl', False) else go.Scatter
+        
+        # One temperature-ranked sample serves both the bar and the scatter chart
+        temperature_df = _downsample(df, 'temperature', max_points)
+        wind_df = _downsample(df, 'wind_speed', max_points)
+        
         fig = make_subplots(
             rows=3, cols=2,
-            subplot_titles=('Temperature by City', 'Weather Conditions Distribution',
-                          'Humidity vs Temperature', 'Wind Speed Analysis',
+            subplot_titles=(_sampled_title('Temperature by City', temperature_df, df),
+                          'Weather Conditions Distribution',
+                          _sampled_title('Humidity vs Temperature', temperature_df, df),
+                          _sampled_title('Wind Speed Analysis', wind_df, df),
                           'Pressure Distribution', 'Weather Summary'),
             specs=[[{"type": "bar"}, {"type": "pie"}],
                    [{"type": "scatter"}, {"type": "bar"}],
@@ -74,7 +180,7 @@ class WeatherAnalyzer:
         
         # Temperature by city
         fig.add_trace(
-            go.Bar(x=df['city'], y=df['temperature'], name='Temperature', 
+            go.Bar(x=temperature_df['city'], y=temperature_df['temperature'], name='Temperature', 
                    marker_color='lightblue'),
             row=1, col=1
         )
@@ -89,26 +195,35 @@ class WeatherAnalyzer:
         
         # Humidity vs Temperature scatter
         fig.add_trace(
-            go.Scatter(x=df['temperature'], y=df['humidity'], 
+            scatter_trace(x=temperature_df['temperature'], y=temperature_df['humidity'], 
                       mode='markers', name='Humidity vs Temp',
-                      text=df['city'], textposition="top center",
+                      text=temperature_df['city'], textposition="top center",
                       marker=dict(size=10, opacity=0.7)),
             row=2, col=1
         )
         
         # Wind speed analysis
         fig.add_trace(
-            go.Bar(x=df['city'], y=df['wind_speed'], name='Wind Speed',
+            go.Bar(x=wind_df['city'], y=wind_df['wind_speed'], name='Wind Speed',
                    marker_color='lightgreen'),
             row=2, col=2
         )
         
-        # Pressure distribution
-        fig.add_trace(
-            go.Histogram(x=df['pressure'], name='Pressure Distribution',
-                        marker_color='lightcoral'),
-            row=3, col=1
-        )
+        # Pressure distribution; binned here rather than in the browser for large sets
+        pressure = df['pressure'].dropna().to_numpy(dtype=float)
+        if max_points and len(pressure) > max_points:
+            counts, edges = np.histogram(pressure, bins=min(int(max_points), 50))
+            fig.add_trace(
+                go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges),
+                       name='Pressure Distribution', marker_color='lightcoral'),
+                row=3, col=1
+            )
+        else:
+            fig.add_trace(
+                go.Histogram(x=df['pressure'], name='Pressure Distribution',
+                            marker_color='lightcoral'),
+                row=3, col=1
+            )
         
         # Summary table
         summary_data = [
@@ -137,12 +252,14 @@ class WeatherAnalyzer:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"weather_dashboard_{timestamp}.html"
         filepath = os.path.join(self.output_path, filename)
-        fig.write_html(filepath)
+        plotlyjs = options.get('plotlyjs', 'inline')
+        fig.write_html(filepath, include_plotlyjs=True if plotlyjs == 'inline' else plotlyjs)
         
         return filepath
     
     def create_comparative_analysis(self, df: pd.DataFrame) -> str:
         """Create comparative analysis between cities"""
+        plt = _pyplot()
         fig, axes = plt.subplots(2, 2, figsize=(16, 12))
         
         # Multi-metric comparison
@@ -176,15 +293,15 @@ class WeatherAnalyzer:
                                ha="center", va="center", color="black")
         
         # Comfort index (custom metric)
-        comfort_index = self.calculate_comfort_index(df)
-        axes[1, 0].bar(df['city'], comfort_index, color='lightgreen', alpha=0.7)
+        comfort_scores = df['comfort_index'] if 'comfort_index' in df.columns else self.calculate_comfort_index(df)
+        axes[1, 0].bar(df['city'], comfort_scores, color='lightgreen', alpha=0.7)
         axes[1, 0].set_title('Weather Comfort Index')
         axes[1, 0].set_xlabel('Cities')
         axes[1, 0].set_ylabel('Comfort Index (0-100)')
         axes[1, 0].tick_params(axis='x', rotation=45)
         
         # Weather severity analysis
-        severity_scores = self.calculate_weather_severity(df)
+        severity_scores = df['severity_score'] if 'severity_score' in df.columns else self.calculate_weather_severity(df)
         axes[1, 1].bar(df['city'], severity_scores, color='orange', alpha=0.7)
         axes[1, 1].set_title('Weather Severity Score')
         axes[1, 1].set_xlabel('Cities')
@@ -193,57 +310,57 @@ class WeatherAnalyzer:
         
         plt.tight_layout()
         
+        return self._save_figure(fig, 'comparative_analysis')
+    
+    def start_pool(self) -> ChartPool:
+        """Pool for render_chart; its worker processes start on the first chart rendered"""
+        return ChartPool()
+    
+    def render_chart(self, name: str, df: pd.DataFrame, metrics: Dict,
+                     executor: Optional[ChartPool] = None) -> Dict:
+        """Render a single chart, in a worker process of `executor` when given
+        
+        A chart already rendered from the same data and options is reused from
+        the artifact cache; its result then has cached=True.
+        """
+        def render() -> Dict:
+            if executor is not None:
+                return executor.submit(_render_chart, self.output_path, self.chart_options,
+                                       name, df, metrics).result()
+            with _inline_render_lock:
+                return _render_chart(self.output_path, self.chart_options, name, df, metrics)
+        
+        started = time.perf_counter()
+        result, cached = self.artifacts.fetch(f'chart:{name}', df, render,
+                                              settings=[self.chart_options.get(name), metrics],
+                                              files=lambda result: [result['path']])
+        if cached:
+            return dict(result, seconds=time.perf_counter() - started, cached=True)
+        
+        # Charts may render in another process, so they are recorded here from the result
+        self.telemetry.record_operation('analyzer', name, result['seconds'], records=len(df))
+        self.telemetry.record_file('analyzer', result['path'])
+        return result
+    
+    def _save_figure(self, fig, name: str) -> str:
+        """Save a matplotlib figure using the chart's configured DPI and format"""
+        options = self.chart_options.get(name, {})
+        image_format = options.get('format', 'png')
+        
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"comparative_analysis_{timestamp}.png"
+        filename = f"{name}_{timestamp}.{image_format}"
         filepath = os.path.join(self.output_path, filename)
-        plt.savefig(filepath, dpi=300, bbox_inches='tight')
-        plt.close()
+        fig.savefig(filepath, dpi=options.get('dpi', 300), format=image_format,
+                    bbox_inches=options.get('bbox_inches', 'tight'))
+        _pyplot().close(fig)
         
         return filepath
     
     def calculate_comfort_index(self, df: pd.DataFrame) -> List[float]:
         """Calculate a comfort index based on temperature, humidity, and wind"""
-        comfort_scores = []
-        
-        for _, row in df.iterrows():
-            temp = row['temperature']
-            humidity = row['humidity']
-            wind = row['wind_speed']
-            
-            # Ideal ranges: temp 18-24°C, humidity 40-60%, wind 1-3 m/s
-            temp_score = max(0, 100 - abs(temp - 21) * 5)
-            humidity_score = max(0, 100 - abs(humidity - 50) * 2)
-            wind_score = max(0, 100 - abs(wind - 2) * 20)
-            
-            comfort_index = (temp_score + humidity_score + wind_score) / 3
-            comfort_scores.append(comfort_index)
-        
-        return comfort_scores
+        return comfort_index(df['temperature'], df['humidity'], df['wind_speed']).tolist()
     
     def calculate_weather_severity(self, df: pd.DataFrame) -> List[float]:
         """Calculate weather severity based on extreme conditions"""
-        severity_scores = []
-        
-        for _, row in df.iterrows():
-            temp = row['temperature']
-            wind = row['wind_speed']
-            humidity = row['humidity']
-            
-            severity = 0
-            
-            # Temperature extremes
-            if temp > 35 or temp < 0:
-                severity += abs(temp - 20) * 2
-            
-            # High wind
-            if wind > 10:
-                severity += wind * 3
-            
-            # Extreme humidity
-            if humidity > 80 or humidity < 20:
-                severity += abs(humidity - 50)
-            
-            severity_scores.append(min(severity, 100))
-        
-        return severity_scores
+        return weather_severity(df['temperature'], df['humidity'], df['wind_speed']).tolist()
 ```
@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+# Fetch time of each payload: differs between runs over the same observations,
+# so it is left out unless the artifact renders it (see fetch's `rendered`)
+IGNORED_COLUMNS = ('timestamp',)
+
+
+def fingerprint(df: pd.DataFrame, *parts, ignored: Sequence[str] = IGNORED_COLUMNS) -> str:
+    """Content hash of a frame's columns, dtypes and values plus any JSON-able parts (e.g. config)"""
+    df = df.drop(columns=[column for column in ignored if column in df.columns])
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps([[str(column), str(dtype)] for column, dtype in df.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    for part in parts:
+        digest.update(json.dumps(part, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+class ArtifactCache:
+    """On-disk cache of derived artifacts keyed by a fingerprint of their input frame
+
+    Layout: <root>/<stage>/<key>/entry.json holding the stage's JSON-able
+    result, next to copies of any files it wrote. On a hit the result is
+    returned as stored and missing output files are restored from the entry;
+    those files are the earlier run's, generation times included.
+    Entries older than max_age seconds are dropped, then the least recently
+    used ones until the cache fits in max_bytes; an artifact larger than
+    max_bytes on its own is not stored.
+    """
+
+    def __init__(self, root: str = "data/artifacts", enabled: bool = False,
+                 max_bytes: int = 256 * 1024 * 1024, max_age: Optional[float] = 7 * 24 * 3600):
+        self.root = root
+        self.enabled = enabled
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # The same frame flows through every stage of a run; hash it once
+        self._fingerprints: Dict[Tuple[int, Tuple[str, ...]], Tuple[weakref.ref, str]] = {}
+        if enabled:
+            os.makedirs(root, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, config: dict) -> "ArtifactCache":
+        """Build the cache from the data section of config.yaml"""
+        artifact_config = config.get('artifacts', {}) or {}
+        return cls(
+            root=artifact_config.get('path') or os.path.join(config.get('storage_path', 'data/'), 'artifacts'),
+            enabled=artifact_config.get('enabled', False),
+            max_bytes=artifact_config.get('max_bytes', 256 * 1024 * 1024),
+            max_age=artifact_config.get('max_age', 7 * 24 * 3600),
+        )
+
+    def memoize(self, stage: str, df: pd.DataFrame, compute: Callable[[], Any], settings: Any = None,
+                files: Optional[Callable[[Any], List[str]]] = None, rendered: Sequence[str] = ()) -> Any:
+        """Cached result of compute() for this stage, frame content and settings"""
+        return self.fetch(stage, df, compute, settings, files, rendered)[0]
+
+    def fetch(self, stage: str, df: pd.DataFrame, compute: Callable[[], Any], settings: Any = None,
+              files: Optional[Callable[[Any], List[str]]] = None,
+              rendered: Sequence[str] = ()) -> Tuple[Any, bool]:
+        """Like memoize(), also returning whether the result came from the cache
+
+        rendered names IGNORED_COLUMNS the artifact writes out, which then
+        count towards its key.
+        """
+        if not self.enabled:
+            return compute(), False
+
+        ignored = tuple(column for column in IGNORED_COLUMNS if column not in rendered)
+        key = hashlib.blake2b(json.dumps([self._frame_fingerprint(df, ignored), stage, settings], sort_keys=True,
+                                         default=str).encode(), digest_size=16).hexdigest()
+        entry_path = os.path.join(self.root, stage.replace(':', '_'), key)
+        cached = self._load(entry_path)
+        with self._lock:
+            if cached is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if cached is not None:
+            return cached, True
+
+        value = compute()
+        self._store(entry_path, value, files(value) if files else [])
+        self.evict()
+        return value, False
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+    def evict(self) -> int:
+        """Drop expired entries, then the least recently used until under max_bytes"""
+        entries = []
+        for stage in self._listdir(self.root):
+            stage_path = os.path.join(self.root, stage)
+            for name in self._listdir(stage_path):
+                if name.endswith('.tmp'):
+                    continue
+                path = os.path.join(stage_path, name)
+                try:
+                    used = os.path.getmtime(path)
+                    size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+                except OSError:
+                    continue
+                entries.append((used, size, path))
+
+        now = time.time()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for used, size, path in sorted(entries):
+            expired = self.max_age is not None and now - used > self.max_age
+            if not expired and total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            removed += 1
+        with self._lock:
+            self.evictions += removed
+        return removed
+
+    def _frame_fingerprint(self, df: pd.DataFrame, ignored: Tuple[str, ...]) -> str:
+        with self._lock:
+            known = self._fingerprints.get((id(df), ignored))
+            if known is not None and known[0]() is df:
+                return known[1]
+        digest = fingerprint(df, ignored=ignored)
+        with self._lock:
+            self._fingerprints = {key: entry for key, entry in self._fingerprints.items() if entry[0]() is not None}
+            self._fingerprints[(id(df), ignored)] = (weakref.ref(df), digest)
+        return digest
+
+    def _load(self, entry_path: str) -> Any:
+        try:
+            with open(os.path.join(entry_path, 'entry.json'), 'r') as f:
+                entry = json.load(f)
+            for name, original in entry['files']:
+                if not os.path.exists(original):
+                    os.makedirs(os.path.dirname(original) or '.', exist_ok=True)
+                    shutil.copy2(os.path.join(entry_path, name), original)
+            os.utime(entry_path)  # most recently used
+        except (OSError, ValueError, KeyError):
+            return None
+        return entry['value']
+
+    def _store(self, entry_path: str, value: Any, files: List[str]):
+        if sum(os.path.getsize(path) for path in files if os.path.exists(path)) > self.max_bytes:
+            return
+        tmp_path = f"{entry_path}.{threading.get_ident()}.tmp"
+        try:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            os.makedirs(tmp_path)
+            stored = []
+            for index, original in enumerate(files):
+                # A copy, not a link: outputs may later be rewritten in place
+                name = f"{index}_{os.path.basename(original)}"
+                shutil.copy2(original, os.path.join(tmp_path, name))
+                stored.append((name, original))
+            with open(os.path.join(tmp_path, 'entry.json'), 'w') as f:
+                json.dump({'value': value, 'files': stored, 'stored_at': time.time()}, f)
+            shutil.rmtree(entry_path, ignore_errors=True)
+            os.replace(tmp_path, entry_path)
+        except (OSError, TypeError, ValueError) as e:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            print(f"Error writing artifact cache: {e}")
+
+    @staticmethod
+    def _listdir(path: str) -> List[str]:
+        try:
+            return os.listdir(path)
+        except OSError:
+            return []
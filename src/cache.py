@@ -0,0 +1,139 @@
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class ResponseCache:
+    """TTL cache for API responses with LRU eviction and an optional disk tier"""
+
+    def __init__(self, ttl: float = 300, max_entries: int = 1024, disk_path: Optional[str] = None,
+                 coord_precision: int = 2):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.disk_path = disk_path
+        self.coord_precision = coord_precision
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+        if disk_path:
+            os.makedirs(disk_path, exist_ok=True)
+
+    def make_key(self, endpoint: str, city: str = None, lat: float = None, lon: float = None,
+                 **params) -> str:
+        """Build a cache key from the endpoint, location and extra query parameters"""
+        if city:
+            location = f"q={city.lower()}"
+        else:
+            location = f"{round(lat, self.coord_precision)},{round(lon, self.coord_precision)}"
+        extra = ','.join(f"{k}={v}" for k, v in sorted(params.items()))
+        return f"{endpoint}|{location}|{extra}"
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return a copy of a fresh cached response, or None on a miss"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, data = entry
+                if now - stored_at < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return copy.deepcopy(data)
+                del self._entries[key]
+
+        entry = self._load_from_disk(key, now)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._store(key, entry)
+        return copy.deepcopy(entry[1])
+
+    def set(self, key: str, data: Dict):
+        """Store a response in memory and, if enabled, on disk"""
+        entry = (time.time(), copy.deepcopy(data))
+        with self._lock:
+            self._store(key, entry)
+        self._save_to_disk(key, entry)
+
+    def clear(self):
+        """Drop all in-memory entries and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.disk_hits = self.evictions = 0
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters for sizing the cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'disk_hits': self.disk_hits,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def _store(self, key: str, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _disk_file(self, key: str) -> str:
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.disk_path, f"{digest}.json")
+
+    def _load_from_disk(self, key: str, now: float):
+        if not self.disk_path:
+            return None
+        filepath = self._disk_file(key)
+        try:
+            with open(filepath, 'r') as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if payload.get('key') != key or now - payload['stored_at'] >= self.ttl:
+            return None
+        return payload['stored_at'], payload['data']
+
+    def _save_to_disk(self, key: str, entry):
+        if not self.disk_path:
+            return
+        filepath = self._disk_file(key)
+        tmp_path = f"{filepath}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({'key': key, 'stored_at': entry[0], 'data': entry[1]}, f)
+            os.replace(tmp_path, filepath)
+        except OSError as e:
+            print(f"Error writing response cache: {e}")
+
+    @classmethod
+    def from_config(cls, config: dict) -> "ResponseCache":
+        """Build a cache from the data section of config.yaml"""
+        cache_config = config.get('cache', {}) or {}
+        disk_path = None
+        if cache_config.get('disk', False):
+            disk_path = cache_config.get('path') or os.path.join(config.get('storage_path', 'data/'), 'cache')
+        return cls(
+            ttl=config.get('update_interval', 300),
+            max_entries=cache_config.get('max_entries', 1024),
+            disk_path=disk_path,
+            coord_precision=cache_config.get('coord_precision', 2),
+        )
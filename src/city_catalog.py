@@ -0,0 +1,240 @@
+import json
+import math
+import os
+import shutil
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Great-circle distance in km; arguments broadcast like NumPy arrays"""
+    lat1, lon1, lat2, lon2 = (np.radians(value) for value in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+class CityCatalog:
+    """City list held as arrays, with a lat/lon grid index for spatial queries
+
+    Names are one UTF-8 buffer plus offsets and coordinates are float64
+    arrays, so a saved catalog of 100k+ cities loads memory-mapped in
+    milliseconds. The index buckets cities into cell_degrees-sized cells
+    (ids sorted once, like a fixed-precision geohash); nearest, radius and
+    bounding-box queries only visit the cells that can match and filter
+    those candidates exactly.
+    """
+
+    def __init__(self, name_data: np.ndarray, name_offsets: np.ndarray, lat: np.ndarray, lon: np.ndarray,
+                 countries: Optional[np.ndarray] = None, cell_degrees: float = 1.0):
+        if not (len(name_offsets) - 1 == len(lat) == len(lon)):
+            raise ValueError("name offsets, latitudes and longitudes must describe the same cities")
+        self.name_data = name_data
+        self.name_offsets = name_offsets
+        self.lat = lat
+        self.lon = lon
+        self.countries = countries
+        self.cell_degrees = cell_degrees
+        self._name_index = None
+
+        self._rows = int(math.ceil(180 / cell_degrees))
+        self._cols = int(math.ceil(360 / cell_degrees))
+        cells = self._cell_ids(np.asarray(lat, dtype=np.float64), np.asarray(lon, dtype=np.float64))
+        self._order = np.argsort(cells, kind='stable')
+        self._sorted_cells = cells[self._order]
+
+    @classmethod
+    def from_records(cls, names: Sequence[str], lat: Sequence[float], lon: Sequence[float],
+                     countries: Optional[Sequence[str]] = None, cell_degrees: float = 1.0) -> 'CityCatalog':
+        encoded = [str(name).encode('utf-8') for name in names]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(name) for name in encoded], out=offsets[1:])
+        name_data = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        if countries is not None:
+            countries = np.array([str(country) if country is not None else '' for country in countries], dtype='U')
+        return cls(name_data, offsets, np.asarray(lat, dtype=np.float64), np.asarray(lon, dtype=np.float64),
+                   countries, cell_degrees)
+
+    @classmethod
+    def from_configs(cls, cities: List[Dict], cell_degrees: float = 1.0) -> 'CityCatalog':
+        """Catalog of config.yaml-style city dicts (name, lat, lon[, country])"""
+        countries = [city.get('country') for city in cities] if any('country' in city for city in cities) else None
+        return cls.from_records([city['name'] for city in cities], [city['lat'] for city in cities],
+                                [city['lon'] for city in cities], countries, cell_degrees)
+
+    @classmethod
+    def from_csv(cls, path: str, cell_degrees: float = 1.0) -> 'CityCatalog':
+        """Parse a CSV with name, lat and lon columns (and optionally country)"""
+        header = pd.read_csv(path, nrows=0).columns
+        columns = ['name', 'lat', 'lon'] + (['country'] if 'country' in header else [])
+        df = pd.read_csv(path, usecols=columns, dtype={'name': str, 'lat': np.float64, 'lon': np.float64,
+                                                       'country': str}, keep_default_na=False)
+        countries = df['country'].tolist() if 'country' in df.columns else None
+        return cls.from_records(df['name'].tolist(), df['lat'].to_numpy(), df['lon'].to_numpy(), countries,
+                                cell_degrees)
+
+    @classmethod
+    def open(cls, path: str, cell_degrees: float = 1.0) -> 'CityCatalog':
+        """Load a saved catalog directory, or a CSV through a binary copy kept next to it"""
+        if os.path.isdir(path):
+            return cls.load(path, cell_degrees=cell_degrees)
+        binary_path = path + '.catalog'
+        if os.path.isdir(binary_path) and os.path.getmtime(binary_path) >= os.path.getmtime(path):
+            return cls.load(binary_path, cell_degrees=cell_degrees)
+        catalog = cls.from_csv(path, cell_degrees)
+        try:
+            catalog.save(binary_path)
+        except OSError as e:
+            print(f"Error caching city catalog: {e}")
+        return catalog
+
+    def save(self, path: str) -> str:
+        """Write the catalog as .npy files plus metadata; arrays load memory-mapped"""
+        tmp_path = path.rstrip('/') + '.tmp'
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        arrays = {'name_data': self.name_data, 'name_offsets': self.name_offsets, 'lat': self.lat, 'lon': self.lon}
+        if self.countries is not None:
+            arrays['countries'] = self.countries
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_path, f'{name}.npy'), np.asarray(array))
+        with open(os.path.join(tmp_path, 'meta.json'), 'w') as f:
+            json.dump({'cities': len(self), 'arrays': sorted(arrays)}, f)
+
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True, cell_degrees: float = 1.0) -> 'CityCatalog':
+        with open(os.path.join(path, 'meta.json'), 'r') as f:
+            meta = json.load(f)
+        arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r' if mmap else None)
+                  for name in meta['arrays']}
+        countries = arrays.get('countries')
+        if countries is not None and countries.dtype.kind == 'S':
+            countries = np.char.decode(countries, 'utf-8')  # saved by an earlier version as bytes
+        return cls(arrays['name_data'], arrays['name_offsets'], arrays['lat'], arrays['lon'], countries, cell_degrees)
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    def name(self, index: int) -> str:
+        start, end = self.name_offsets[index], self.name_offsets[index + 1]
+        return self.name_data[start:end].tobytes().decode('utf-8')
+
+    def city(self, index: int) -> Dict:
+        """One city as a config.yaml-style dict"""
+        city = {'name': self.name(index), 'lat': float(self.lat[index]), 'lon': float(self.lon[index])}
+        if self.countries is not None and self.countries[index]:
+            city['country'] = str(self.countries[index])
+        return city
+
+    def to_configs(self, indices: Optional[Sequence[int]] = None) -> List[Dict]:
+        """City dicts for WeatherAPI, for the given indices or the whole catalog"""
+        indices = range(len(self)) if indices is None else np.asarray(indices).tolist()
+        return [self.city(index) for index in indices]
+
+    def find(self, name: str) -> Optional[int]:
+        """Index of the first city with this name (case-insensitive), if any"""
+        if self._name_index is None:
+            index = {}
+            for i in range(len(self) - 1, -1, -1):
+                index[self.name(i).lower()] = i
+            self._name_index = index
+        return self._name_index.get(name.lower())
+
+    def within_bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> np.ndarray:
+        """Indices of cities inside the box; min_lon > max_lon wraps across the antimeridian"""
+        candidates = self._candidates(min_lat, max_lat, self._lon_ranges(min_lon, max_lon))
+        lat = self.lat[candidates]
+        lon = self.lon[candidates]
+        inside = (lat >= min_lat) & (lat <= max_lat)
+        if min_lon <= max_lon:
+            inside &= (lon >= min_lon) & (lon <= max_lon)
+        else:
+            inside &= (lon >= min_lon) | (lon <= max_lon)
+        return np.sort(candidates[inside])
+
+    def within_radius(self, lat: float, lon: float, radius_km: float) -> Tuple[np.ndarray, np.ndarray]:
+        """(indices, distances in km) of cities within radius_km, nearest first"""
+        angle = radius_km / EARTH_RADIUS_KM
+        lat_span = math.degrees(angle)
+        min_lat, max_lat = lat - lat_span, lat + lat_span
+        if min_lat <= -90 or max_lat >= 90 or angle >= math.pi / 2:
+            lon_ranges = [(0, self._cols - 1)]  # the circle reaches a pole: every longitude
+        else:
+            lon_span = math.degrees(math.asin(min(math.sin(angle) / math.cos(math.radians(lat)), 1.0)))
+            lon_ranges = self._lon_ranges(lon - lon_span, lon + lon_span)
+
+        candidates = self._candidates(max(min_lat, -90), min(max_lat, 90), lon_ranges)
+        distances = haversine_km(lat, lon, self.lat[candidates], self.lon[candidates])
+        inside = distances <= radius_km
+        candidates, distances = candidates[inside], distances[inside]
+        order = np.argsort(distances, kind='stable')
+        return candidates[order], distances[order]
+
+    def nearest(self, lat: float, lon: float, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """(indices, distances in km) of the k nearest cities, nearest first
+
+        Searches a growing radius: once it holds k cities no city outside it
+        can be closer.
+        """
+        k = min(k, len(self))
+        radius = self.cell_degrees * 111.2
+        while True:
+            indices, distances = self.within_radius(lat, lon, radius)
+            if len(indices) >= k or radius >= math.pi * EARTH_RADIUS_KM:
+                return indices[:k], distances[:k]
+            radius *= 2
+
+    def select(self, near: Optional[Dict] = None, bbox: Optional[Sequence[float]] = None) -> np.ndarray:
+        """Indices for a config selection: near {lat, lon | city, radius_km} and/or bbox [min_lat, min_lon, max_lat, max_lon]"""
+        selected = np.arange(len(self))
+        if near:
+            if 'city' in near:
+                center = self.find(near['city'])
+                if center is None:
+                    raise ValueError(f"Unknown catalog city {near['city']!r}")
+                lat, lon = float(self.lat[center]), float(self.lon[center])
+            else:
+                lat, lon = near['lat'], near['lon']
+            selected = np.sort(self.within_radius(lat, lon, near['radius_km'])[0])
+        if bbox:
+            selected = np.intersect1d(selected, self.within_bbox(*bbox))
+        return selected
+
+    def _cell_ids(self, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        rows = np.clip(((lat + 90) // self.cell_degrees).astype(np.int64), 0, self._rows - 1)
+        cols = ((lon + 180) // self.cell_degrees).astype(np.int64) % self._cols
+        return rows * self._cols + cols
+
+    def _lon_ranges(self, min_lon: float, max_lon: float) -> List[Tuple[int, int]]:
+        """Inclusive column ranges covering [min_lon, max_lon], split at the antimeridian"""
+        if max_lon - min_lon >= 360:
+            return [(0, self._cols - 1)]
+        min_lon, max_lon = (min_lon + 180) % 360, (max_lon + 180) % 360
+        first = int(min_lon // self.cell_degrees) % self._cols
+        last = int(max_lon // self.cell_degrees) % self._cols
+        if min_lon <= max_lon:
+            return [(first, last)]
+        if first <= last:  # wraps almost all the way round
+            return [(0, self._cols - 1)]
+        return [(first, self._cols - 1), (0, last)]
+
+    def _candidates(self, min_lat: float, max_lat: float, lon_ranges: List[Tuple[int, int]]) -> np.ndarray:
+        """Catalog indices in the grid cells covering the latitude band and column ranges"""
+        if min_lat > max_lat or not len(self):
+            return np.zeros(0, dtype=np.int64)
+        first_row = max(int((min_lat + 90) // self.cell_degrees), 0)
+        last_row = min(int((max_lat + 90) // self.cell_degrees), self._rows - 1)
+        rows = np.arange(first_row, last_row + 1) * self._cols
+        slices = []
+        for first_col, last_col in lon_ranges:
+            starts = np.searchsorted(self._sorted_cells, rows + first_col, side='left')
+            ends = np.searchsorted(self._sorted_cells, rows + last_col, side='right')
+            slices.extend(self._order[start:end] for start, end in zip(starts.tolist(), ends.tolist()) if end > start)
+        return np.concatenate(slices) if slices else np.zeros(0, dtype=np.int64)
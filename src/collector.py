@@ -0,0 +1,121 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+# fetch(item, deadline, on_send): on_send marks the moment the request is sent
+Fetch = Callable[[Dict, Optional[float], Optional[Callable[[], None]]], Dict]
+
+
+@dataclass
+class CollectionResult:
+    """Outcome of a deadline-bounded collection run"""
+    completed: List[Dict] = field(default_factory=list)
+    missed: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+    hedged: int = 0
+    elapsed: float = 0.0
+
+
+class DeadlineCollector:
+    """Run fetches concurrently within a total deadline, hedging slow requests
+
+    A request's hedge clock starts when fetch reports it sent (on_send), not
+    when a worker picks it up, so time queued behind the rate limiter never
+    triggers a hedge.
+    """
+
+    def __init__(self, fetch: Fetch, max_workers: int = 10,
+                 deadline: Optional[float] = None, hedge_after: Optional[float] = None,
+                 hedge_workers: int = 2):
+        self.fetch = fetch
+        self.max_workers = max_workers
+        self.deadline = deadline
+        self.hedge_after = hedge_after
+        self.hedge_workers = hedge_workers
+
+    def collect(self, items: List[Dict], key: Callable[[Dict], str] = lambda item: item['name']) -> CollectionResult:
+        """Fetch every item, returning what completed before the deadline expired"""
+        start = time.monotonic()
+        deadline = start + self.deadline if self.deadline else None
+
+        results = [None] * len(items)
+        started = {}
+        failed = set()
+        hedged = set()
+        futures_by_index = {}
+        pending = {}
+
+        def run(index: int) -> Dict:
+            return self.fetch(items[index], deadline, lambda: started.setdefault(index, time.monotonic()))
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        hedge_executor = ThreadPoolExecutor(max_workers=self.hedge_workers) if self.hedge_after else None
+
+        try:
+            for index in range(len(items)):
+                future = executor.submit(run, index)
+                pending[future] = index
+                futures_by_index[index] = [future]
+
+            while pending:
+                now = time.monotonic()
+                timeout = None
+                if deadline is not None:
+                    timeout = deadline - now
+                    if timeout <= 0:
+                        break
+                if hedge_executor is not None:
+                    next_hedge = self._next_hedge_delay(started, results, hedged | failed, now)
+                    timeout = next_hedge if timeout is None else min(timeout, next_hedge)
+
+                done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    index = pending.pop(future)
+                    if results[index] is not None:
+                        continue
+                    try:
+                        data = future.result()
+                    except Exception as e:
+                        print(f"Error collecting {key(items[index])}: {e}")
+                        data = None
+
+                    if data:
+                        results[index] = data
+                        # The first response wins; drop the duplicate if it has not started
+                        for other in futures_by_index[index]:
+                            if other is not future and pending.pop(other, None) is not None:
+                                other.cancel()
+                    elif not any(f in pending for f in futures_by_index[index]):
+                        failed.add(index)
+
+                if hedge_executor is not None:
+                    now = time.monotonic()
+                    for index, started_at in list(started.items()):
+                        if (results[index] is None and index not in hedged and index not in failed
+                                and now - started_at >= self.hedge_after):
+                            hedged.add(index)
+                            future = hedge_executor.submit(self.fetch, items[index], deadline, None)
+                            pending[future] = index
+                            futures_by_index[index].append(future)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            if hedge_executor is not None:
+                hedge_executor.shutdown(wait=False, cancel_futures=True)
+
+        return CollectionResult(
+            completed=[data for data in results if data],
+            missed=[key(items[i]) for i, data in enumerate(results) if data is None and i not in failed],
+            failed=[key(items[i]) for i in sorted(failed)],
+            hedged=len(hedged),
+            elapsed=time.monotonic() - start,
+        )
+
+    def _next_hedge_delay(self, started: Dict, results: List, skip: set, now: float) -> float:
+        """Seconds until the earliest running request becomes eligible for hedging"""
+        delay = self.hedge_after
+        for index, started_at in list(started.items()):
+            if results[index] is None and index not in skip:
+                delay = min(delay, started_at + self.hedge_after - now)
+        return max(delay, 0.01)
@@ -3,21 +3,67 @@ import pandas as pd
 import numpy as np
 import json
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
 import os
+from dataclasses import asdict
+from src.alert_rules import AlertRuleEngine
+from src.artifact_cache import ArtifactCache
+from src.indices import add_index_columns
+from src.metrics import MetricsEngine
+from src.forecast_cube import ForecastCube
+from src.history_store import HistoryStore
+from src.incremental import ObservationState, ObservationUpdate
+from src.raw_archive import RawArchive
+from src.telemetry import Telemetry, timed
+from src.weather_schema import CURRENT_WEATHER_SCHEMA, FORECAST_SCHEMA, build_frame
 
 class WeatherDataProcessor:
-    def __init__(self, data_path: str = "data/"):
+    def __init__(self, data_path: str = "data/", alert_rules: List[Dict] = None,
+                 export_csv: bool = True, raw_archive: Dict = None, telemetry: Telemetry = None,
+                 incremental: bool = False, artifacts: ArtifactCache = None):
         self.data_path = data_path
+        self.telemetry = telemetry or Telemetry()
+        self.artifacts = artifacts or ArtifactCache()
+        self.export_csv = export_csv
+        self.alert_engine = AlertRuleEngine(alert_rules)
+        self.metrics_engine = MetricsEngine()
         self.raw_path = os.path.join(data_path, "raw")
         self.processed_path = os.path.join(data_path, "processed")
+        self.forecast_path = os.path.join(data_path, "forecast")
         
         # Create directories if they don't exist
         os.makedirs(self.raw_path, exist_ok=True)
         os.makedirs(self.processed_path, exist_ok=True)
+        os.makedirs(self.forecast_path, exist_ok=True)
+        
+        # Append-only columnar history of every processed run
+        self.history = HistoryStore(os.path.join(data_path, "history"))
+        
+        # Compressed rolling archive for raw responses, if enabled
+        self.raw_archive = None
+        if raw_archive and raw_archive.get('enabled', False):
+            self.raw_archive = RawArchive(
+                os.path.join(self.raw_path, "archive"),
+                rotation=raw_archive.get('rotation', 'hourly'),
+                max_bytes=raw_archive.get('max_bytes', 64 * 1024 * 1024)
+            )
+        
+        # Latest observation per city, so unchanged payloads are not reprocessed
+        self.incremental = incremental
+        self.observations = ObservationState(os.path.join(self.processed_path, "latest_observations.parquet")
+                                             if incremental else None)
     
+    @timed('processor')
     def save_raw_data(self, data: List[Dict], filename: str = None) -> str:
-        """Save raw weather data to JSON file"""
+        """Save raw weather data to JSON file, or append it to the raw archive"""
+        if filename is None and self.raw_archive is not None:
+            bytes_before = self.raw_archive.bytes_written
+            filepath = self.raw_archive.append(data)
+            self.telemetry.record_count('processor', 'save_raw_data', len(data))
+            self.telemetry.record_file('processor', filepath, self.raw_archive.bytes_written - bytes_before)
+            print(f"Raw data archived to: {filepath}")
+            return filepath
+        
         if filename is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"weather_data_{timestamp}.json"
@@ -26,145 +72,109 @@ class WeatherDataProcessor:
         
         with open(filepath, 'w') as f:
             json.dump(data, f, indent=2)
+        self.telemetry.record_count('processor', 'save_raw_data', len(data))
+        self.telemetry.record_file('processor', filepath)
         
         print(f"Raw data saved to: {filepath}")
         return filepath
     
+    @timed('processor')
     def process_current_weather(self, raw_data: List[Dict]) -> pd.DataFrame:
         """Process current weather data into a structured DataFrame"""
-        processed_data = []
-        
-        for data in raw_data:
-            try:
-                record = {
-                    'timestamp': data.get('timestamp'),
-                    'city': data.get('name', 'Unknown'),
-                    'country': data.get('sys', {}).get('country', 'Unknown'),
-                    'latitude': data.get('coord', {}).get('lat'),
-                    'longitude': data.get('coord', {}).get('lon'),
-                    'temperature': data.get('main', {}).get('temp'),
-                    'feels_like': data.get('main', {}).get('feels_like'),
-                    'humidity': data.get('main', {}).get('humidity'),
-                    'pressure': data.get('main', {}).get('pressure'),
-                    'visibility': data.get('visibility'),
-                    'wind_speed': data.get('wind', {}).get('speed'),
-                    'wind_direction': data.get('wind', {}).get('deg'),
-                    'cloudiness': data.get('clouds', {}).get('all'),
-                    'weather_main': data.get('weather', [{}])[0].get('main'),
-                    'weather_description': data.get('weather', [{}])[0].get('description'),
-                    'sunrise': data.get('sys', {}).get('sunrise'),
-                    'sunset': data.get('sys', {}).get('sunset'),
-                }
-                processed_data.append(record)
-                
-            except Exception as e:
-                print(f"Error processing weather data: {e}")
-                continue
-        
-        df = pd.DataFrame(processed_data)
-        
-        # Convert timestamp to datetime
-        if 'timestamp' in df.columns:
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-        
-        # Convert sunrise/sunset to datetime
-        if 'sunrise' in df.columns:
-            df['sunrise'] = pd.to_datetime(df['sunrise'], unit='s')
-        if 'sunset' in df.columns:
-            df['sunset'] = pd.to_datetime(df['sunset'], unit='s')
-            
+        df = build_frame(raw_data, CURRENT_WEATHER_SCHEMA)
+        self.telemetry.record_count('processor', 'process_current_weather', len(df))
+        
+        # Derived indices are stored so downstream consumers do not recompute them
+        return add_index_columns(df)
+    
+    @timed('processor')
+    def update_observations(self, raw_data: List[Dict]) -> ObservationUpdate:
+        """Process only payloads whose (city id, dt) is new and merge them into the latest snapshot"""
+        update = self.observations.update(raw_data, self.process_current_weather)
+        self.telemetry.record_count('processor', 'update_observations', len(update.records))
+        return update
+    
+    @timed('processor')
+    def process_forecast(self, raw_forecasts: List[Dict]) -> pd.DataFrame:
+        """Process forecast payloads into one row per city and forecast step"""
+        entries = []
+        cities = []
+        for data in raw_forecasts:
+            city = data.get('city', {}).get('name') or data.get('city_config', {}).get('name', 'Unknown')
+            steps = data.get('list', [])
+            entries.extend(steps)
+            cities.extend([city] * len(steps))
+        
+        df = build_frame(entries, FORECAST_SCHEMA)
+        df.insert(0, 'city', np.array(cities, dtype=object))
+        self.telemetry.record_count('processor', 'process_forecast', len(df))
         return df
     
+    @timed('processor')
+    def process_forecast_cube(self, raw_forecasts: List[Dict]) -> ForecastCube:
+        """Parse forecast payloads into a dense (city, step, variable) float32 cube"""
+        cube = ForecastCube.from_payloads(raw_forecasts)
+        self.telemetry.record_count('processor', 'process_forecast_cube', len(cube))
+        return cube
+    
+    @timed('processor')
+    def save_forecast(self, cube: ForecastCube) -> str:
+        """Persist a forecast cube under forecast/forecast_<timestamp>/"""
+        timestamp = cube.fetched_at.strftime("%Y%m%d_%H%M%S")
+        path = cube.save(os.path.join(self.forecast_path, f"forecast_{timestamp}"))
+        for name in os.listdir(path):
+            self.telemetry.record_file('processor', os.path.join(path, name))
+        print(f"Forecast saved to: {path}")
+        return path
+    
+    def load_latest_forecast(self) -> Optional[ForecastCube]:
+        """Memory-map the most recently saved forecast cube, if any"""
+        saved = sorted(name for name in os.listdir(self.forecast_path)
+                       if name.startswith('forecast_') and not name.endswith('.tmp'))
+        if not saved:
+            return None
+        return ForecastCube.load(os.path.join(self.forecast_path, saved[-1]))
+    
+    @timed('processor')
     def calculate_metrics(self, df: pd.DataFrame) -> Dict:
         """Calculate various weather metrics and statistics"""
-        if df.empty:
-            return {}
-        
-        metrics = {
-            'summary': {
-                'total_cities': len(df),
-                'avg_temperature': df['temperature'].mean(),
-                'max_temperature': df['temperature'].max(),
-                'min_temperature': df['temperature'].min(),
-                'avg_humidity': df['humidity'].mean(),
-                'avg_pressure': df['pressure'].mean(),
-                'avg_wind_speed': df['wind_speed'].mean(),
-            },
-            'temperature_analysis': {
-                'std_deviation': df['temperature'].std(),
-                'temperature_range': df['temperature'].max() - df['temperature'].min(),
-                'cities_above_average': len(df[df['temperature'] > df['temperature'].mean()]),
-                'hottest_city': df.loc[df['temperature'].idxmax(), 'city'] if not df.empty else None,
-                'coldest_city': df.loc[df['temperature'].idxmin(), 'city'] if not df.empty else None,
-            },
-            'weather_conditions': {
-                'condition_distribution': df['weather_main'].value_counts().to_dict(),
-                'most_common_condition': df['weather_main'].mode().iloc[0] if not df['weather_main'].empty else None,
-            },
-            'wind_analysis': {
-                'max_wind_speed': df['wind_speed'].max(),
-                'cities_with_high_wind': len(df[df['wind_speed'] > df['wind_speed'].quantile(0.75)]),
-                'windiest_city': df.loc[df['wind_speed'].idxmax(), 'city'] if not df.empty else None,
-            },
-            'humidity_analysis': {
-                'high_humidity_cities': len(df[df['humidity'] > 70]),
-                'low_humidity_cities': len(df[df['humidity'] < 30]),
-                'most_humid_city': df.loc[df['humidity'].idxmax(), 'city'] if not df.empty else None,
-            }
-        }
-        
-        return metrics
+        return self.artifacts.memoize('metrics', df, lambda: self.metrics_engine.compute(df))
+    
+    def calculate_grouped_metrics(self, df: pd.DataFrame, by: str = 'country') -> Dict[str, Dict]:
+        """Calculate the same metrics separately for each country (or other column)"""
+        return self.metrics_engine.compute_grouped(df, by)
     
+    @timed('processor')
     def detect_weather_alerts(self, df: pd.DataFrame) -> List[Dict]:
-        """Detect potential weather alerts based on thresholds"""
-        alerts = []
-        
-        for _, row in df.iterrows():
-            city = row['city']
-            
-            # Temperature alerts
-            if row['temperature'] > 40:
-                alerts.append({
-                    'city': city,
-                    'type': 'EXTREME_HEAT',
-                    'value': row['temperature'],
-                    'message': f"Extreme heat warning: {row['temperature']:.1f}°C"
-                })
-            elif row['temperature'] < -20:
-                alerts.append({
-                    'city': city,
-                    'type': 'EXTREME_COLD',
-                    'value': row['temperature'],
-                    'message': f"Extreme cold warning: {row['temperature']:.1f}°C"
-                })
-            
-            # Wind alerts
-            if row['wind_speed'] > 20:
-                alerts.append({
-                    'city': city,
-                    'type': 'HIGH_WIND',
-                    'value': row['wind_speed'],
-                    'message': f"High wind warning: {row['wind_speed']:.1f} m/s"
-                })
-            
-            # Humidity alerts
-            if row['humidity'] > 90:
-                alerts.append({
-                    'city': city,
-                    'type': 'HIGH_HUMIDITY',
-                    'value': row['humidity'],
-                    'message': f"High humidity: {row['humidity']}%"
-                })
-        
-        return alerts
+        """Detect potential weather alerts based on the configured rules"""
+        rules = [asdict(rule) for rule in self.alert_engine.rules]
+        return self.artifacts.memoize('alerts', df, lambda: self.alert_engine.evaluate(df), settings=rules)
     
-    def save_processed_data(self, df: pd.DataFrame, metrics: Dict, alerts: List[Dict]) -> str:
-        """Save processed data to files"""
+    def load_history(self, start: str = None, end: str = None, cities: List[str] = None,
+                     columns: List[str] = None) -> pd.DataFrame:
+        """Load a city/time-range slice of stored processed data"""
+        return self.history.read(start=start, end=end, cities=cities, columns=columns)
+    
+    @timed('processor')
+    def save_processed_data(self, df: pd.DataFrame, metrics: Dict, alerts: List[Dict],
+                            new_rows: pd.DataFrame = None) -> str:
+        """Save processed data to files
+        
+        new_rows, in incremental mode, are the only rows appended to history;
+        df is still the full snapshot that metrics and alerts describe.
+        """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
-        # Save DataFrame to CSV
-        csv_path = os.path.join(self.processed_path, f"processed_weather_{timestamp}.csv")
-        df.to_csv(csv_path, index=False)
+        # Append DataFrame to the columnar history store
+        history_files = self.history.append(df if new_rows is None else new_rows)
+        if self.incremental:
+            self.observations.save()
+        
+        # Optionally also export the DataFrame to CSV
+        csv_path = None
+        if self.export_csv:
+            csv_path = os.path.join(self.processed_path, f"processed_weather_{timestamp}.csv")
+            df.to_csv(csv_path, index=False)
         
         # Save metrics and alerts to JSON
         json_path = os.path.join(self.processed_path, f"analysis_{timestamp}.json")
@@ -177,7 +187,14 @@ class WeatherDataProcessor:
         with open(json_path, 'w') as f:
             json.dump(analysis_data, f, indent=2)
         
-        print(f"Processed data saved to: {csv_path}")
+        self.telemetry.record_count('processor', 'save_processed_data', len(df))
+        for written in history_files + [csv_path, json_path]:
+            self.telemetry.record_file('processor', written)
+        
+        for history_file in history_files:
+            print(f"Processed data appended to: {history_file}")
+        if csv_path:
+            print(f"Processed data exported to: {csv_path}")
         print(f"Analysis saved to: {json_path}")
         
         return csv_path, json_path
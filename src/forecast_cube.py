@@ -0,0 +1,153 @@
+import json
+import os
+import shutil
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from src.weather_schema import FORECAST_SCHEMA, extract_columns
+
+# Numeric forecast fields stored in the cube, in axis order
+FORECAST_VARIABLES = tuple(field.name for field in FORECAST_SCHEMA
+                           if field.dtype in ('float', 'int') and field.name != 'forecast_time')
+
+REDUCERS = {
+    'max': np.nanmax,
+    'min': np.nanmin,
+    'mean': np.nanmean,
+    'sum': np.nansum,
+}
+
+TimeLike = Union[str, datetime, pd.Timestamp, np.datetime64]
+
+
+class ForecastCube:
+    """Forecasts for many cities as one dense float32 array
+
+    values has shape (city, step, variable); `times` is the shared step axis
+    (datetime64[s]) built from the union of every city's forecast times, and
+    steps a city has no forecast for hold NaN. Queries reduce whole axes at
+    once, so their cost does not grow with per-row Python work.
+    """
+
+    def __init__(self, cities: np.ndarray, times: np.ndarray, values: np.ndarray,
+                 variables: Sequence[str] = FORECAST_VARIABLES, fetched_at: Optional[datetime] = None):
+        if values.shape != (len(cities), len(times), len(variables)):
+            raise ValueError(f"values shape {values.shape} does not match "
+                             f"({len(cities)}, {len(times)}, {len(variables)})")
+        self.cities = np.asarray(cities)
+        self.times = np.asarray(times, dtype='datetime64[s]')
+        self.values = values
+        self.variables = tuple(variables)
+        self.fetched_at = fetched_at or datetime.now()
+        self._city_index = {city: i for i, city in enumerate(self.cities.tolist())}
+        self._variable_index = {variable: i for i, variable in enumerate(self.variables)}
+
+    @classmethod
+    def from_payloads(cls, raw_forecasts: List[Dict], fetched_at: Optional[datetime] = None) -> 'ForecastCube':
+        """Parse /forecast payloads (one per city) into a cube in a single pass over the entries"""
+        cities = []
+        entries = []
+        counts = []
+        for data in raw_forecasts:
+            steps = data.get('list', [])
+            if not steps:
+                continue
+            cities.append(data.get('city', {}).get('name') or data.get('city_config', {}).get('name', 'Unknown'))
+            entries.extend(steps)
+            counts.append(len(steps))
+
+        columns = extract_columns(entries, FORECAST_SCHEMA)
+        epoch = columns['forecast_time']
+        known = ~np.isnan(epoch)
+        times, step_index = np.unique(epoch[known].astype(np.int64), return_inverse=True)
+        city_index = np.repeat(np.arange(len(cities)), counts)[known]
+
+        values = np.full((len(cities), len(times), len(FORECAST_VARIABLES)), np.nan, dtype=np.float32)
+        stacked = np.column_stack([columns[variable][known] for variable in FORECAST_VARIABLES])
+        values[city_index, step_index] = stacked
+        return cls(np.array(cities, dtype=object), times.astype('datetime64[s]'), values,
+                   FORECAST_VARIABLES, fetched_at)
+
+    def __len__(self) -> int:
+        return len(self.cities)
+
+    def variable(self, name: str) -> np.ndarray:
+        """(city, step) view of one variable"""
+        return self.values[:, :, self._variable_index[name]]
+
+    def step_mask(self, hours: Optional[float] = None, start: Optional[TimeLike] = None) -> np.ndarray:
+        """Steps within [start, start + hours); start defaults to the first step"""
+        if not len(self.times):
+            return np.zeros(0, dtype=bool)
+        start = self.times[0] if start is None else np.datetime64(pd.Timestamp(start), 's')
+        mask = self.times >= start
+        if hours is not None:
+            mask &= self.times < start + np.timedelta64(int(hours * 3600), 's')
+        return mask
+
+    def aggregate(self, variable: str, how: str = 'max', hours: Optional[float] = None,
+                  start: Optional[TimeLike] = None) -> pd.Series:
+        """Reduce one variable over a time window per city, e.g. max wind over the next 24h"""
+        if how not in REDUCERS:
+            raise ValueError(f"Unknown reduction {how!r}, expected one of {list(REDUCERS)}")
+        window = self.variable(variable)[:, self.step_mask(hours, start)]
+        result = np.full(len(self.cities), np.nan, dtype=np.float64)
+        has_data = ~np.isnan(window).all(axis=1) if window.shape[1] else np.zeros(len(self.cities), bool)
+        if has_data.any():
+            result[has_data] = REDUCERS[how](window[has_data], axis=1)
+        return pd.Series(result, index=pd.Index(self.cities, name='city'), name=f"{how}_{variable}")
+
+    def first_exceedance(self, variable: str, threshold: float, hours: Optional[float] = None,
+                         start: Optional[TimeLike] = None) -> pd.Series:
+        """Earliest forecast time per city at which variable exceeds threshold (NaT if never)"""
+        mask = self.step_mask(hours, start)
+        exceeds = self.variable(variable)[:, mask] > threshold
+        times = self.times[mask]
+        first = np.full(len(self.cities), np.datetime64('NaT'), dtype='datetime64[s]')
+        hit = exceeds.any(axis=1)
+        first[hit] = times[exceeds[hit].argmax(axis=1)]
+        return pd.Series(first, index=pd.Index(self.cities, name='city'), name=f"{variable}_above_{threshold:g}")
+
+    def city(self, name: str) -> pd.DataFrame:
+        """One city's forecast as a time-indexed frame"""
+        frame = pd.DataFrame(self.values[self._city_index[name]], columns=list(self.variables))
+        frame.index = pd.DatetimeIndex(self.times, name='forecast_time')
+        return frame
+
+    def to_frame(self) -> pd.DataFrame:
+        """Long format (city, forecast_time, variables...), skipping steps a city has no data for"""
+        n_cities, n_times, n_variables = self.values.shape
+        flat = self.values.reshape(n_cities * n_times, n_variables)
+        present = ~np.isnan(flat).all(axis=1)
+        frame = pd.DataFrame(flat[present], columns=list(self.variables))
+        frame.insert(0, 'forecast_time', np.tile(self.times, n_cities)[present])
+        frame.insert(0, 'city', np.repeat(self.cities, n_times)[present])
+        return frame
+
+    def save(self, path: str) -> str:
+        """Write the cube as .npy files plus metadata; values load memory-mapped"""
+        tmp_path = path.rstrip('/') + '.tmp'
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        np.save(os.path.join(tmp_path, 'values.npy'), self.values)
+        np.save(os.path.join(tmp_path, 'times.npy'), self.times.astype(np.int64))
+        np.save(os.path.join(tmp_path, 'cities.npy'), self.cities.astype(str))
+        with open(os.path.join(tmp_path, 'meta.json'), 'w') as f:
+            json.dump({'variables': list(self.variables), 'fetched_at': self.fetched_at.isoformat(),
+                       'shape': list(self.values.shape)}, f)
+
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> 'ForecastCube':
+        with open(os.path.join(path, 'meta.json'), 'r') as f:
+            meta = json.load(f)
+        values = np.load(os.path.join(path, 'values.npy'), mmap_mode='r' if mmap else None)
+        times = np.load(os.path.join(path, 'times.npy')).astype('datetime64[s]')
+        cities = np.load(os.path.join(path, 'cities.npy')).astype(object)
+        return cls(cities, times, values, meta['variables'], datetime.fromisoformat(meta['fetched_at']))
@@ -0,0 +1,183 @@
+import os
+import uuid
+from datetime import datetime, date
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.weather_schema import CURRENT_WEATHER_SCHEMA
+
+_ARROW_TYPES = {
+    'float': pa.float64(),
+    'int': pa.int64(),
+    'str': pa.string(),
+    'epoch': pa.timestamp('us'),
+    'isotime': pa.timestamp('us'),
+}
+
+# Fixed column types so every run's file shares one schema, even when an
+# integer column had missing values (and was float64 in pandas) in that run
+HISTORY_COLUMN_TYPES = {field.name: _ARROW_TYPES[field.dtype] for field in CURRENT_WEATHER_SCHEMA}
+HISTORY_COLUMN_TYPES.update({
+    'comfort_index': pa.float64(),
+    'severity_score': pa.float64(),
+})
+
+PARTITION_COLUMN = 'date'
+
+DateLike = Union[str, date, datetime, pd.Timestamp]
+
+
+class HistoryStore:
+    """Append-only, date-partitioned Parquet store of processed weather runs
+
+    Layout: <root>/date=YYYY-MM-DD/run-<time>-<id>.parquet, one file per run
+    and day. Readers prune partitions by date and project only the columns
+    they ask for; compact() merges a day's run files into one, after
+    which run_times() no longer lists them.
+    """
+
+    def __init__(self, root: str = "data/history", compression: str = 'zstd'):
+        self.root = root
+        self.compression = compression
+        os.makedirs(root, exist_ok=True)
+
+    def append(self, df: pd.DataFrame, run_time: Optional[datetime] = None) -> List[str]:
+        """Append one run's processed frame, returning the files written"""
+        if df.empty:
+            return []
+        run_time = run_time or datetime.now()
+
+        if 'timestamp' in df.columns:
+            dates = pd.to_datetime(df['timestamp']).dt.date.fillna(run_time.date())
+        else:
+            dates = pd.Series(run_time.date(), index=df.index)
+
+        written = []
+        for day, day_df in df.groupby(dates.to_numpy(), sort=True):
+            partition = os.path.join(self.root, f"{PARTITION_COLUMN}={day.isoformat()}")
+            os.makedirs(partition, exist_ok=True)
+            filename = f"run-{run_time.strftime('%Y%m%dT%H%M%S%f')}-{uuid.uuid4().hex[:8]}.parquet"
+            filepath = os.path.join(partition, filename)
+
+            # Write to a temporary name so readers never see a partial file
+            tmp_path = filepath + '.tmp'
+            pq.write_table(self._to_table(day_df), tmp_path, compression=self.compression)
+            os.replace(tmp_path, filepath)
+            written.append(filepath)
+        return written
+
+    def read(self, start: Optional[DateLike] = None, end: Optional[DateLike] = None,
+             cities: Optional[Iterable[str]] = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Load history for a time range and optional cities, reading only the requested columns"""
+        paths = self._partition_files(start, end)
+        if not paths:
+            return pd.DataFrame(columns=columns or list(HISTORY_COLUMN_TYPES))
+
+        dataset = ds.dataset(paths, format='parquet', schema=self._dataset_schema(paths))
+
+        condition = None
+        if start is not None:
+            condition = self._and(condition, ds.field('timestamp') >= pa.scalar(pd.Timestamp(start), pa.timestamp('us')))
+        if end is not None:
+            condition = self._and(condition, ds.field('timestamp') < pa.scalar(pd.Timestamp(end), pa.timestamp('us')))
+        if cities is not None:
+            condition = self._and(condition, ds.field('city').isin(list(cities)))
+
+        table = dataset.to_table(columns=columns, filter=condition)
+        return table.to_pandas()
+
+    def partitions(self) -> List[str]:
+        """Return the dates (YYYY-MM-DD) that have stored data"""
+        prefix = f"{PARTITION_COLUMN}="
+        return sorted(name[len(prefix):] for name in os.listdir(self.root) if name.startswith(prefix))
+
+    def compact(self, day: DateLike) -> Optional[str]:
+        """Merge all run files of one day into a single file"""
+        day = pd.Timestamp(day).date().isoformat()
+        partition = os.path.join(self.root, f"{PARTITION_COLUMN}={day}")
+        files = self._files_in(partition)
+        if len(files) < 2:
+            return files[0] if files else None
+
+        table = ds.dataset(files, format='parquet', schema=self._dataset_schema(files)).to_table()
+        filepath = os.path.join(partition, f"compacted-{uuid.uuid4().hex[:8]}.parquet")
+        tmp_path = filepath + '.tmp'
+        pq.write_table(table, tmp_path, compression=self.compression)
+        os.replace(tmp_path, filepath)
+        for path in files:
+            os.remove(path)
+        return filepath
+
+    def run_times(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[datetime]:
+        """Times of the stored runs made in [start, end), read from their file names"""
+        times = []
+        for path in self._partition_files(None, None):
+            name = os.path.basename(path)
+            if not name.startswith('run-'):
+                continue
+            run_time = datetime.strptime(name[4:25], '%Y%m%dT%H%M%S%f')
+            if (start is None or run_time >= start) and (end is None or run_time < end):
+                times.append(run_time)
+        return sorted(times)
+
+    def stats(self) -> Dict:
+        """Return partition and file counts for the store"""
+        files = self._partition_files(None, None)
+        return {
+            'partitions': len(self.partitions()),
+            'files': len(files),
+            'bytes': sum(os.path.getsize(path) for path in files),
+        }
+
+    def _to_table(self, df: pd.DataFrame) -> pa.Table:
+        arrays = []
+        fields = []
+        for column in df.columns:
+            series = df[column]
+            arrow_type = HISTORY_COLUMN_TYPES.get(column)
+            if arrow_type is None:
+                array = pa.array(series, from_pandas=True)
+            elif pa.types.is_timestamp(arrow_type):
+                array = pa.array(pd.to_datetime(series).astype('datetime64[us]'), type=arrow_type, from_pandas=True)
+            elif pa.types.is_string(arrow_type):
+                array = pa.array(series.astype(object).where(series.notna(), None), type=arrow_type)
+            else:
+                array = pa.array(series.to_numpy(dtype=np.float64, na_value=np.nan), type=arrow_type, from_pandas=True)
+            arrays.append(array)
+            fields.append(pa.field(column, array.type))
+        return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+    def _partition_files(self, start: Optional[DateLike], end: Optional[DateLike]) -> List[str]:
+        """Files of the partitions overlapping [start, end), skipping the rest unopened"""
+        first = pd.Timestamp(start).date().isoformat() if start is not None else None
+        last = pd.Timestamp(end).date().isoformat() if end is not None else None
+        files = []
+        for day in self.partitions():
+            if first is not None and day < first:
+                continue
+            if last is not None and day > last:
+                continue
+            files.extend(self._files_in(os.path.join(self.root, f"{PARTITION_COLUMN}={day}")))
+        return files
+
+    @staticmethod
+    def _files_in(partition: str) -> List[str]:
+        if not os.path.isdir(partition):
+            return []
+        return sorted(os.path.join(partition, name) for name in os.listdir(partition)
+                      if name.endswith('.parquet'))
+
+    @staticmethod
+    def _dataset_schema(paths: List[str]) -> pa.Schema:
+        """Newest file's schema plus the fixed column types; older files missing a column load as null"""
+        known = pa.schema(list(HISTORY_COLUMN_TYPES.items()))
+        return pa.unify_schemas([pq.read_schema(paths[-1]), known])
+
+    @staticmethod
+    def _and(condition, clause):
+        return clause if condition is None else condition & clause
@@ -0,0 +1,128 @@
+import json
+import os
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.weather_schema import Field, extract_columns
+
+KEY_COLUMN = 'observation_key'
+DT_COLUMN = 'observation_dt'
+DTYPES_METADATA = b'observation_dtypes'
+
+
+# Payload fields identifying an observation, read in one compiled pass
+OBSERVATION_SCHEMA = (
+    Field('id', ('id',), 'float'),
+    Field('dt', ('dt',), 'float'),
+    Field('name', ('name',), 'str', 'Unknown'),
+)
+
+
+def observation_keys(raw_data: List[Dict]):
+    """(station key, observation dt) arrays for current-weather payloads
+
+    The key is the OpenWeatherMap city id when present, otherwise the city name.
+    """
+    columns = extract_columns(raw_data, OBSERVATION_SCHEMA)
+    ids = columns['id']
+    has_id = ~np.isnan(ids)
+    keys = np.empty(len(ids), dtype=object)
+    keys[has_id] = [f"id:{city_id}" for city_id in ids[has_id].astype(np.int64).tolist()]
+    keys[~has_id] = [f"name:{name}" for name in columns['name'][~has_id].tolist()]
+    return keys, columns['dt']
+
+
+@dataclass
+class ObservationUpdate:
+    """Result of folding one collection into the observation state"""
+    snapshot: pd.DataFrame  # latest processed row for every city in this collection
+    rows: pd.DataFrame  # processed rows of the new observations only
+    records: List[Dict]  # raw payloads of the new observations
+    unchanged: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return len(self.records) > 0
+
+
+class ObservationState:
+    """Latest processed observation per city, keyed on (city id, observation dt)
+
+    OpenWeatherMap refreshes a station roughly every ten minutes, so on a
+    shorter cycle most payloads repeat the previous one. update() processes
+    only the payloads whose dt moved and swaps their rows into the snapshot,
+    keeping the previous rows of everything else, so unchanged cities are
+    never parsed again. With a path the snapshot survives restarts as a
+    Parquet file, which records the column dtypes so the reloaded snapshot
+    (and its artifact fingerprint) matches the one saved.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.snapshot = pd.DataFrame()
+        self.keys = np.array([], dtype=object)  # observation key of each snapshot row
+        self.dts = np.array([], dtype=np.float64)  # its observation dt, NaN if unknown
+        if path and os.path.exists(path):
+            self.load()
+
+    def update(self, raw_data: List[Dict], process: Callable[[List[Dict]], pd.DataFrame]) -> ObservationUpdate:
+        """Process the new observations in raw_data with `process` and merge them into the snapshot"""
+        keys, dts = observation_keys(raw_data)
+        keys = pd.Index(keys)
+        if keys.has_duplicates:
+            # One row per station; the last payload for a key wins
+            keep = ~keys.duplicated(keep='last')
+            raw_data = [record for record, kept in zip(raw_data, keep.tolist()) if kept]
+            keys, dts = keys[keep], dts[keep]
+
+        positions = pd.Index(self.keys).get_indexer(keys)
+        held = self.dts[positions] if len(self.dts) else np.full(len(keys), np.nan)
+        held[positions < 0] = np.nan
+        fresh = np.isnan(dts) | (held != dts)  # NaN never compares equal, so unseen keys are fresh
+
+        records = [record for record, is_fresh in zip(raw_data, fresh.tolist()) if is_fresh]
+        rows = process(records)
+        unchanged = len(raw_data) - len(records)
+        if not records and np.array_equal(positions, np.arange(len(self.keys))):
+            return ObservationUpdate(self.snapshot, rows, records, unchanged)
+
+        # Row positions in [previous snapshot, new rows]; cities missing from
+        # this collection drop out, as they would in a full run
+        offset = len(self.snapshot)
+        combined = pd.concat([self.snapshot, rows], ignore_index=True) if offset else rows.reset_index(drop=True)
+        positions[fresh] = offset + np.arange(len(records))
+        self.snapshot = combined.take(positions).reset_index(drop=True)
+        self.keys = keys.to_numpy(dtype=object)
+        self.dts = dts
+        return ObservationUpdate(self.snapshot, rows, records, unchanged)
+
+    def save(self) -> Optional[str]:
+        if not self.path:
+            return None
+        frame = self.snapshot.copy()
+        frame.insert(0, KEY_COLUMN, self.keys)
+        frame[DT_COLUMN] = self.dts
+        # Parquet has no second-resolution timestamps, so the dtypes are restored from here on load
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        dtypes = json.dumps({column: str(dtype) for column, dtype in self.snapshot.dtypes.items()})
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), DTYPES_METADATA: dtypes})
+        tmp_path = self.path + '.tmp'
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, self.path)
+        return self.path
+
+    def load(self):
+        table = pq.read_table(self.path)
+        frame = table.to_pandas()
+        self.keys = frame.pop(KEY_COLUMN).to_numpy(dtype=object)
+        self.dts = frame.pop(DT_COLUMN).to_numpy(dtype=np.float64)
+        dtypes = json.loads((table.schema.metadata or {}).get(DTYPES_METADATA, b'{}'))
+        for column, dtype in dtypes.items():
+            if column in frame.columns and str(frame[column].dtype) != dtype:
+                frame[column] = frame[column].astype(dtype)
+        self.snapshot = frame
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+INDEX_COLUMNS = ('comfort_index', 'severity_score')
+
+
+def _positive_part(values: np.ndarray) -> np.ndarray:
+    """max(0, x) elementwise, mapping NaN to 0 like Python's built-in max(0, x)"""
+    return np.where(values > 0, values, 0.0)
+
+
+def comfort_index(temperature, humidity, wind_speed) -> np.ndarray:
+    """Comfort index (0-100) from temperature, humidity and wind arrays"""
+    temperature = np.asarray(temperature, dtype=np.float64)
+    humidity = np.asarray(humidity, dtype=np.float64)
+    wind_speed = np.asarray(wind_speed, dtype=np.float64)
+
+    # Ideal ranges: temp 18-24°C, humidity 40-60%, wind 1-3 m/s
+    with np.errstate(invalid='ignore'):
+        temp_score = _positive_part(100 - np.abs(temperature - 21) * 5)
+        humidity_score = _positive_part(100 - np.abs(humidity - 50) * 2)
+        wind_score = _positive_part(100 - np.abs(wind_speed - 2) * 20)
+
+    return (temp_score + humidity_score + wind_score) / 3
+
+
+def weather_severity(temperature, humidity, wind_speed) -> np.ndarray:
+    """Weather severity score (capped at 100) from extreme conditions"""
+    temperature = np.asarray(temperature, dtype=np.float64)
+    humidity = np.asarray(humidity, dtype=np.float64)
+    wind_speed = np.asarray(wind_speed, dtype=np.float64)
+
+    with np.errstate(invalid='ignore'):
+        # Temperature extremes
+        severity = np.where((temperature > 35) | (temperature < 0), np.abs(temperature - 20) * 2, 0.0)
+        # High wind
+        severity += np.where(wind_speed > 10, wind_speed * 3, 0.0)
+        # Extreme humidity
+        severity += np.where((humidity > 80) | (humidity < 20), np.abs(humidity - 50), 0.0)
+
+    return np.minimum(severity, 100)
+
+
+def add_index_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Add comfort_index and severity_score columns to a processed weather frame"""
+    if df.empty or not {'temperature', 'humidity', 'wind_speed'}.issubset(df.columns):
+        return df
+    temperature = df['temperature'].to_numpy()
+    humidity = df['humidity'].to_numpy()
+    wind_speed = df['wind_speed'].to_numpy()
+    df['comfort_index'] = comfort_index(temperature, humidity, wind_speed)
+    df['severity_score'] = weather_severity(temperature, humidity, wind_speed)
+    return df
@@ -0,0 +1,175 @@
+import json
+import math
+from datetime import date, datetime
+from json.encoder import encode_basestring as _encode_string
+from typing import Any, Dict, Iterable, List, Optional, TextIO, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def json_default(value: Any) -> Any:
+    """json.dumps fallback for NumPy scalars/arrays, timestamps and missing values"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (pd.Timestamp, datetime, date)):
+        return None if pd.isna(value) else value.isoformat()
+    if value is pd.NaT or value is pd.NA:
+        return None
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def finite_values(value: Any) -> Any:
+    """Copy of a plain value with NaN and infinite floats, NumPy ones too, replaced by None"""
+    if isinstance(value, (float, np.floating)):
+        return float(value) if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: finite_values(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [finite_values(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return finite_values(value.tolist())
+    return value
+
+
+def _encode_float(value: float) -> str:
+    return repr(value) if math.isfinite(value) else 'null'
+
+
+def datetime_unit(series: pd.Series) -> str:
+    """'s' for datetime columns without sub-second parts, otherwise 'us'"""
+    values = series.to_numpy(dtype='datetime64[us]')
+    values = values[~np.isnat(values)]
+    return 'us' if (values.astype(np.int64) % 1_000_000).any() else 's'
+
+
+def encode_column(series: pd.Series, unit: Optional[str] = None) -> List[str]:
+    """Encode a column to JSON value strings, choosing the encoder once per dtype"""
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype) and not series.hasnans:
+        return ['true' if value else 'false' for value in series.to_numpy().tolist()]
+    if pd.api.types.is_integer_dtype(dtype) and not series.hasnans:
+        return list(map(str, series.to_numpy().tolist()))
+    if pd.api.types.is_float_dtype(dtype):
+        return list(map(_encode_float, series.to_numpy(dtype=np.float64, na_value=np.nan).tolist()))
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        values = series.to_numpy(dtype='datetime64[us]')
+        valid = ~np.isnat(values)
+        strings = np.datetime_as_string(values, unit=unit or datetime_unit(series))
+        return [f'"{text}"' if ok else 'null' for text, ok in zip(strings.tolist(), valid.tolist())]
+
+    encoded = []
+    for value in series.tolist():
+        if isinstance(value, str):
+            encoded.append(_encode_string(value))
+        elif value is None or (isinstance(value, float) and math.isnan(value)) or value is pd.NA or value is pd.NaT:
+            encoded.append('null')
+        else:
+            encoded.append(json.dumps(finite_values(value), default=json_default, ensure_ascii=False,
+                                      allow_nan=False))
+    return encoded
+
+
+class StreamingJSONWriter:
+    """Write JSON documents to a file incrementally, with DataFrames as record arrays
+
+    Frames are serialised column by column into value strings and then joined
+    into records in batches, so Python dicts and boxed scalars are never built
+    per row. Plain values go through json.dumps with the same indentation rules,
+    so indented output matches json.dump layout; NaN is written as null
+    everywhere, so every output is strict JSON.
+    """
+
+    def __init__(self, f: TextIO, indent: Optional[int] = 2, chunk_size: int = 1000,
+                 rows_per_batch: int = 10000):
+        self.f = f
+        self.indent = indent
+        self.chunk_size = chunk_size
+        self.rows_per_batch = rows_per_batch
+        self.key_separator = ': ' if indent is not None else ':'
+
+    def write_object(self, items: Iterable[Tuple[str, Any]], level: int = 0):
+        """Write an object whose values may be plain JSON values, lists or DataFrames"""
+        self.f.write('{')
+        first = True
+        for key, value in items:
+            if not first:
+                self.f.write(',')
+            first = False
+            self.f.write(self._newline(level + 1) + _encode_string(key) + self.key_separator)
+            if isinstance(value, pd.DataFrame):
+                self._write_array(self.iter_records(value, level + 2), level + 1)
+            elif isinstance(value, list):
+                self._write_array((self.dumps(item, level + 2) for item in value), level + 1)
+            else:
+                self.f.write(self.dumps(value, level + 1))
+        if not first:
+            self.f.write(self._newline(level))
+        self.f.write('}')
+
+    def write_ndjson(self, header: Dict, df: pd.DataFrame):
+        """Write a header object line followed by one line per DataFrame record"""
+        self.f.write(json.dumps(finite_values(header), separators=(',', ':'), ensure_ascii=False,
+                                default=json_default, allow_nan=False) + '\n')
+        self._write_lines(record + '\n' for record in self.iter_records(df, compact=True))
+
+    def iter_records(self, df: pd.DataFrame, level: int = 0, compact: bool = False):
+        """Yield each DataFrame row as a JSON object string, encoding one batch of rows at a time"""
+        keys = [_encode_string(str(column)) for column in df.columns]
+        units = {column: datetime_unit(df[column]) for column in df.columns
+                 if pd.api.types.is_datetime64_any_dtype(df[column].dtype)}
+
+        if compact or self.indent is None:
+            opening, separator, closing = '{', ',', '}'
+            prefixes = [f'{key}:' for key in keys]
+        else:
+            opening = '{' + self._newline(level + 1)
+            separator = ',' + self._newline(level + 1)
+            closing = self._newline(level) + '}'
+            prefixes = [f'{key}: ' for key in keys]
+
+        for start in range(0, len(df), self.rows_per_batch):
+            batch = df.iloc[start:start + self.rows_per_batch]
+            columns = [encode_column(batch[column], units.get(column)) for column in df.columns]
+            for values in zip(*columns):
+                yield opening + separator.join([prefix + value for prefix, value in zip(prefixes, values)]) + closing
+
+    def dumps(self, value: Any, level: int = 0) -> str:
+        """json.dumps a plain value, re-indented for its nesting level (NaN becomes null)"""
+        text = json.dumps(finite_values(value), indent=self.indent, separators=(',', self.key_separator),
+                          ensure_ascii=False, default=json_default, allow_nan=False)
+        if self.indent is not None and level:
+            text = text.replace('\n', self._newline(level))
+        return text
+
+    def _write_array(self, elements: Iterable[str], level: int):
+        prefix = self._newline(level + 1)
+
+        def framed():
+            first = True
+            for element in elements:
+                yield (prefix if first else ',' + prefix) + element
+                first = False
+            if not first:
+                yield self._newline(level)
+
+        self.f.write('[')
+        self._write_lines(framed())
+        self.f.write(']')
+
+    def _write_lines(self, fragments: Iterable[str]):
+        chunk = []
+        for fragment in fragments:
+            chunk.append(fragment)
+            if len(chunk) >= self.chunk_size:
+                self.f.write(''.join(chunk))
+                chunk = []
+        if chunk:
+            self.f.write(''.join(chunk))
+
+    def _newline(self, level: int) -> str:
+        if self.indent is None:
+            return ''
+        return '\n' + ' ' * (self.indent * level)
@@ -0,0 +1,220 @@
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+
+@dataclass
+class ColumnStats:
+    """Per-group statistics for one numeric column, as arrays indexed by group"""
+    count: np.ndarray
+    mean: np.ndarray
+    std: np.ndarray
+    min: np.ndarray
+    max: np.ndarray
+    argmin: np.ndarray
+    argmax: np.ndarray
+    above_mean: np.ndarray
+
+
+class MetricsEngine:
+    """Compute weather metrics with one set of reductions per column, optionally per group
+
+    Rows are ordered by group once; every statistic is then a segmented
+    reduction (np.*.reduceat) over that ordering, so no filtered sub-frames
+    are built and ungrouped metrics are simply the single-group case.
+    """
+
+    HIGH_HUMIDITY = 70
+    LOW_HUMIDITY = 30
+    HIGH_WIND_QUANTILE = 0.75
+
+    def compute(self, df: pd.DataFrame) -> Dict:
+        """Return metrics for the whole frame in the calculate_metrics shape"""
+        if df.empty:
+            return {}
+        return self._compute(df, None, 1)[0]
+
+    def compute_grouped(self, df: pd.DataFrame, by: str = 'country') -> Dict[str, Dict]:
+        """Return metrics per value of a grouping column (e.g. country or region)"""
+        if df.empty:
+            return {}
+        codes, groups = pd.factorize(df[by], use_na_sentinel=False)
+        results = self._compute(df, codes.astype(np.intp), len(groups))
+        return {group: metrics for group, metrics in zip(groups.tolist(), results)}
+
+    def _compute(self, df: pd.DataFrame, codes: Optional[np.ndarray], n_groups: int):
+        if codes is None:
+            # Single group: rows are already in group order, nothing to permute
+            codes = np.zeros(len(df), dtype=np.intp)
+            order = None
+            sorted_codes = codes
+            starts = np.array([0])
+        else:
+            order = np.argsort(codes, kind='stable')
+            sorted_codes = codes[order]
+            starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+        sizes = np.diff(np.r_[starts, len(codes)])
+        present = sorted_codes[starts]
+
+        def ordered(values: np.ndarray) -> np.ndarray:
+            return values if order is None else values[order]
+
+        def segmented(values: np.ndarray) -> 'ColumnStats':
+            return self._column_stats(ordered(values), order, sorted_codes, starts, present, n_groups)
+
+        temperature = segmented(df['temperature'].to_numpy(dtype=np.float64, na_value=np.nan))
+        humidity = df['humidity'].to_numpy(dtype=np.float64, na_value=np.nan)
+        humidity_stats = segmented(humidity)
+        pressure = segmented(df['pressure'].to_numpy(dtype=np.float64, na_value=np.nan))
+        wind = df['wind_speed'].to_numpy(dtype=np.float64, na_value=np.nan)
+        wind_stats = segmented(wind)
+
+        humidity = ordered(humidity)
+        high_humidity = self._count_where(humidity > self.HIGH_HUMIDITY, starts, present, n_groups)
+        low_humidity = self._count_where(humidity < self.LOW_HUMIDITY, starts, present, n_groups)
+        wind_q75 = self._quantile(wind, codes, n_groups, self.HIGH_WIND_QUANTILE)
+        with np.errstate(invalid='ignore'):
+            high_wind = self._count_where(ordered(wind) > self._expand(wind_q75, sorted_codes), starts, present, n_groups)
+
+        conditions = self._condition_counts(df['weather_main'], codes, n_groups)
+
+        group_sizes = np.zeros(n_groups, dtype=np.int64)
+        group_sizes[present] = sizes
+
+        cities = df['city']
+        results = []
+        for g in range(n_groups):
+            distribution, most_common = conditions[g]
+            results.append({
+                'summary': {
+                    'total_cities': int(group_sizes[g]),
+                    'avg_temperature': float(temperature.mean[g]),
+                    'max_temperature': float(temperature.max[g]),
+                    'min_temperature': float(temperature.min[g]),
+                    'avg_humidity': float(humidity_stats.mean[g]),
+                    'avg_pressure': float(pressure.mean[g]),
+                    'avg_wind_speed': float(wind_stats.mean[g]),
+                },
+                'temperature_analysis': {
+                    'std_deviation': float(temperature.std[g]),
+                    'temperature_range': float(temperature.max[g] - temperature.min[g]),
+                    'cities_above_average': int(temperature.above_mean[g]),
+                    'hottest_city': self._city_at(cities, temperature.argmax[g]),
+                    'coldest_city': self._city_at(cities, temperature.argmin[g]),
+                },
+                'weather_conditions': {
+                    'condition_distribution': distribution,
+                    'most_common_condition': most_common,
+                },
+                'wind_analysis': {
+                    'max_wind_speed': float(wind_stats.max[g]),
+                    'cities_with_high_wind': int(high_wind[g]),
+                    'windiest_city': self._city_at(cities, wind_stats.argmax[g]),
+                },
+                'humidity_analysis': {
+                    'high_humidity_cities': int(high_humidity[g]),
+                    'low_humidity_cities': int(low_humidity[g]),
+                    'most_humid_city': self._city_at(cities, humidity_stats.argmax[g]),
+                }
+            })
+        return results
+
+    def _column_stats(self, values: np.ndarray, order: Optional[np.ndarray], sorted_codes: np.ndarray,
+                      starts: np.ndarray, present: np.ndarray, n_groups: int) -> ColumnStats:
+        """Segmented reductions over values already ordered by group"""
+        valid = ~np.isnan(values)
+        filled = np.where(valid, values, 0.0)
+
+        count = self._scatter(np.add.reduceat(valid.astype(np.int64), starts), present, n_groups, 0)
+        total = self._scatter(np.add.reduceat(filled, starts), present, n_groups, 0.0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = total / count
+            centered = np.where(valid, values - self._expand(mean, sorted_codes), 0.0)
+            sum_sq = self._scatter(np.add.reduceat(centered * centered, starts), present, n_groups, 0.0)
+            std = np.sqrt(sum_sq / (count - 1))
+            std[count < 2] = np.nan
+
+        with np.errstate(invalid='ignore'):
+            vmin = self._scatter(np.fmin.reduceat(values, starts), present, n_groups, np.nan)
+            vmax = self._scatter(np.fmax.reduceat(values, starts), present, n_groups, np.nan)
+            above_mean = self._count_where(values > self._expand(mean, sorted_codes), starts, present, n_groups)
+            argmin = self._first_match(values == self._expand(vmin, sorted_codes), order, sorted_codes, n_groups)
+            argmax = self._first_match(values == self._expand(vmax, sorted_codes), order, sorted_codes, n_groups)
+
+        return ColumnStats(count, mean, std, vmin, vmax, argmin, argmax, above_mean)
+
+    @staticmethod
+    def _expand(per_group: np.ndarray, sorted_codes: np.ndarray):
+        """Broadcast per-group values back onto the ordered rows"""
+        return per_group[0] if len(per_group) == 1 else per_group[sorted_codes]
+
+    @staticmethod
+    def _scatter(reduced: np.ndarray, present: np.ndarray, n_groups: int, fill) -> np.ndarray:
+        out = np.full(n_groups, fill, dtype=np.result_type(reduced.dtype, np.asarray(fill).dtype))
+        out[present] = reduced
+        return out
+
+    def _count_where(self, mask: np.ndarray, starts: np.ndarray, present: np.ndarray, n_groups: int) -> np.ndarray:
+        return self._scatter(np.add.reduceat(mask.astype(np.int64), starts), present, n_groups, 0)
+
+    @staticmethod
+    def _first_match(mask: np.ndarray, order: Optional[np.ndarray], sorted_codes: np.ndarray, n_groups: int) -> np.ndarray:
+        """Original row position of the first True in each group (-1 if none)"""
+        positions = np.full(n_groups, -1, dtype=np.intp)
+        hits = np.flatnonzero(mask)
+        groups, first = np.unique(sorted_codes[hits], return_index=True)
+        positions[groups] = hits[first] if order is None else order[hits[first]]
+        return positions
+
+    @staticmethod
+    def _quantile(values: np.ndarray, codes: np.ndarray, n_groups: int, q: float) -> np.ndarray:
+        """Linear-interpolated quantile per group, ignoring NaN"""
+        result = np.full(n_groups, np.nan)
+        if n_groups == 1:
+            # np.nanquantile partitions instead of sorting
+            if not np.isnan(values).all():
+                result[0] = np.nanquantile(values, q)
+            return result
+        valid = ~np.isnan(values)
+        v = values[valid]
+        c = codes[valid]
+        if len(v) == 0:
+            return result
+        order = np.lexsort((v, c))
+        v = v[order]
+        counts = np.bincount(c, minlength=n_groups)
+        offsets = np.r_[0, np.cumsum(counts)[:-1]]
+        has_values = counts > 0
+        position = q * (counts[has_values] - 1)
+        lower = np.floor(position).astype(np.intp)
+        upper = np.ceil(position).astype(np.intp)
+        base = offsets[has_values]
+        low_values = v[base + lower]
+        result[has_values] = low_values + (v[base + upper] - low_values) * (position - lower)
+        return result
+
+    @staticmethod
+    def _condition_counts(conditions: pd.Series, codes: np.ndarray, n_groups: int):
+        """Per-group condition distribution (count desc) and most common condition"""
+        condition_codes, labels = pd.factorize(conditions)
+        labels = labels.tolist()
+        valid = condition_codes >= 0
+        pairs = codes[valid] * len(labels) + condition_codes[valid]
+        counts = np.bincount(pairs, minlength=n_groups * len(labels)).reshape(n_groups, len(labels))
+
+        results = []
+        for row in counts:
+            # Stable sort keeps first-appearance order among ties, like value_counts
+            ranked = np.argsort(-row, kind='stable')
+            distribution = {labels[i]: int(row[i]) for i in ranked if row[i] > 0}
+            most_common = None
+            if distribution:
+                top = row[ranked[0]]
+                most_common = min(label for label, count in distribution.items() if count == top)
+            results.append((distribution, most_common))
+        return results
+
+    @staticmethod
+    def _city_at(cities: pd.Series, position: int) -> Optional[str]:
+        return cities.iloc[position] if position >= 0 else None
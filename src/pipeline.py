@@ -0,0 +1,136 @@
+import contextlib
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, ContextManager, Dict, List, Optional, Tuple
+
+
+class SkipStage(Exception):
+    """Raised by a stage to skip it and its downstream stages without failing the run"""
+
+
+@dataclass
+class StageResult:
+    """Outcome of one pipeline stage; times are perf_counter offsets from the run start"""
+    name: str
+    status: str = 'pending'  # ok, failed or skipped
+    value: Any = None
+    error: Optional[BaseException] = None
+    started: float = 0.0
+    finished: float = 0.0
+
+    @property
+    def seconds(self) -> float:
+        return self.finished - self.started
+
+
+@dataclass
+class PipelineRun:
+    results: Dict[str, StageResult]
+    deps: Dict[str, Tuple[str, ...]]
+    elapsed: float = 0.0
+
+    def value(self, name: str) -> Any:
+        return self.results[name].value
+
+    def ok(self, name: str) -> bool:
+        return self.results[name].status == 'ok'
+
+    def failed(self) -> List[StageResult]:
+        return [result for result in self.results.values() if result.status == 'failed']
+
+    def critical_path(self) -> List[StageResult]:
+        """The chain of stages that determined the run's wall-clock time
+
+        Starts at the stage that finished last and walks back through the
+        dependency each stage actually waited on (the one finishing latest).
+        """
+        ran = [result for result in self.results.values() if result.status in ('ok', 'failed')]
+        if not ran:
+            return []
+        path = [max(ran, key=lambda result: result.finished)]
+        while True:
+            upstream = [self.results[dep] for dep in self.deps[path[-1].name]]
+            if not upstream:
+                break
+            path.append(max(upstream, key=lambda result: result.finished))
+        return path[::-1]
+
+
+class Pipeline:
+    """A small DAG of named stages run on a thread pool
+
+    Each stage is called with the values of its dependencies, in the order
+    they were declared, as soon as all of them have succeeded. A failing
+    stage only skips the stages downstream of it; independent stages still
+    run to completion. A stage raising SkipStage is marked skipped (with
+    the exception as its error) and so is everything downstream of it.
+    `around(name)`, if given, returns a context manager
+    entered around each stage in its worker thread (used for profiling);
+    `on_done(result)`, if given, is called in that thread as each stage
+    that ran finishes (used for live progress).
+    """
+
+    def __init__(self, max_workers: Optional[int] = None,
+                 around: Optional[Callable[[str], ContextManager]] = None,
+                 on_done: Optional[Callable[[StageResult], None]] = None):
+        self.max_workers = max_workers
+        self.around = around or (lambda name: contextlib.nullcontext())
+        self.on_done = on_done
+        self._stages: Dict[str, Tuple[Callable, Tuple[str, ...]]] = {}
+
+    def stage(self, name: str, func: Callable, deps: Tuple[str, ...] = ()) -> 'Pipeline':
+        """Add a stage; dependencies must already be declared, so the graph stays acyclic"""
+        if name in self._stages:
+            raise ValueError(f"Duplicate stage {name!r}")
+        unknown = [dep for dep in deps if dep not in self._stages]
+        if unknown:
+            raise ValueError(f"Stage {name!r} depends on undeclared stages {unknown}")
+        self._stages[name] = (func, tuple(deps))
+        return self
+
+    def run(self) -> PipelineRun:
+        """Execute every stage, returning per-stage results and timings"""
+        deps = {name: stage_deps for name, (_, stage_deps) in self._stages.items()}
+        run = PipelineRun({name: StageResult(name) for name in self._stages}, deps)
+        origin = time.perf_counter()
+
+        def execute(name: str):
+            func, stage_deps = self._stages[name]
+            result = run.results[name]
+            result.started = time.perf_counter() - origin
+            try:
+                with self.around(name):
+                    result.value = func(*(run.results[dep].value for dep in stage_deps))
+                result.status = 'ok'
+            except SkipStage as e:
+                result.error = e
+                result.status = 'skipped'
+            except Exception as e:
+                result.error = e
+                result.status = 'failed'
+            finally:
+                result.finished = time.perf_counter() - origin
+            if self.on_done is not None:
+                self.on_done(result)
+
+        pending = dict(self._stages)
+        running = set()
+        workers = self.max_workers or max(len(self._stages), 1)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='stage') as executor:
+            while pending or running:
+                for name, (_, stage_deps) in list(pending.items()):
+                    statuses = [run.results[dep].status for dep in stage_deps]
+                    if any(status in ('failed', 'skipped') for status in statuses):
+                        run.results[name].status = 'skipped'
+                    elif all(status == 'ok' for status in statuses):
+                        running.add(executor.submit(execute, name))
+                    else:
+                        continue
+                    del pending[name]
+
+                if running:
+                    done, running = wait(running, return_when=FIRST_COMPLETED)
+
+        run.elapsed = time.perf_counter() - origin
+        return run
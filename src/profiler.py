@@ -0,0 +1,137 @@
+import contextlib
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import time
+import tracemalloc
+from typing import Dict, List
+
+
+class StageProfiler:
+    """CPU and memory profiles for pipeline stages run one at a time
+
+    Use stage(name) as the pipeline's `around` hook with a single worker:
+    each stage gets its own cProfile profile, its peak traced memory and the
+    allocation sites that grew most while it ran. write() saves one .prof
+    file per stage (loadable with pstats or snakeviz) plus a text and JSON
+    summary with the hot functions ranked across all stages.
+    """
+
+    def __init__(self, output_path: str, top: int = 25, trace_frames: int = 1):
+        self.output_path = output_path
+        self.top = top
+        self.trace_frames = trace_frames
+        self.stages: Dict[str, Dict] = {}
+        self._profiles: Dict[str, cProfile.Profile] = {}
+        os.makedirs(output_path, exist_ok=True)
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(self.trace_frames)
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        before = self._snapshot()
+
+        profile = cProfile.Profile()
+        wall_started = time.perf_counter()
+        cpu_started = time.process_time()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            wall = time.perf_counter() - wall_started
+            cpu = time.process_time() - cpu_started
+            current, peak = tracemalloc.get_traced_memory()
+            growth = self._snapshot().compare_to(before, 'lineno')
+            if started_tracing:
+                tracemalloc.stop()
+
+            self._profiles[name] = profile
+            self.stages[name] = {
+                'wall_seconds': wall,
+                'cpu_seconds': cpu,
+                'peak_bytes': peak - baseline,
+                'retained_bytes': current - baseline,
+                'top_allocations': [
+                    {'site': str(stat.traceback[0]), 'size_diff': stat.size_diff, 'count_diff': stat.count_diff}
+                    for stat in sorted(growth, key=lambda stat: stat.size_diff, reverse=True)[:self.top]
+                    if stat.size_diff > 0
+                ],
+            }
+
+    def hot_functions(self) -> List[Dict]:
+        """Functions ranked by own (exclusive) time across every profiled stage"""
+        if not self._profiles:
+            return []
+        stats = pstats.Stats(*self._profiles.values())
+        ranked = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)
+        return [
+            {
+                'function': pstats.func_std_string(func),
+                'calls': total_calls,
+                'own_seconds': own_time,
+                'cumulative_seconds': cumulative_time,
+            }
+            for func, (_, total_calls, own_time, cumulative_time, _) in ranked[:self.top]
+        ]
+
+    def write(self) -> Dict[str, str]:
+        """Save per-stage .prof files and the summary; returns the summary paths"""
+        for name, profile in self._profiles.items():
+            profile.dump_stats(os.path.join(self.output_path, f"{self._filename(name)}.prof"))
+
+        summary = {'stages': self.stages, 'hot_functions': self.hot_functions()}
+        json_path = os.path.join(self.output_path, 'profile_summary.json')
+        with open(json_path, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+        text_path = os.path.join(self.output_path, 'profile_summary.txt')
+        with open(text_path, 'w') as f:
+            f.write(self.format_summary())
+
+        return {'json': json_path, 'text': text_path}
+
+    def format_summary(self) -> str:
+        lines = ["PER-STAGE PROFILE", ""]
+        lines.append(f"{'stage':<32} {'wall s':>8} {'cpu s':>8} {'peak MiB':>9} {'kept MiB':>9}")
+        for name, stage in sorted(self.stages.items(), key=lambda item: item[1]['wall_seconds'], reverse=True):
+            lines.append(f"{name:<32} {stage['wall_seconds']:>8.3f} {stage['cpu_seconds']:>8.3f} "
+                         f"{stage['peak_bytes'] / 2**20:>9.2f} {stage['retained_bytes'] / 2**20:>9.2f}")
+
+        lines += ["", "HOT FUNCTIONS (by own time, all stages)", ""]
+        for rank, hot in enumerate(self.hot_functions(), start=1):
+            lines.append(f"{rank:>3}. {hot['own_seconds']:>8.4f}s own {hot['cumulative_seconds']:>8.4f}s cum "
+                         f"{hot['calls']:>9} calls  {hot['function']}")
+
+        for name, stage in self.stages.items():
+            if not stage['top_allocations']:
+                continue
+            lines += ["", f"TOP ALLOCATION SITES: {name}"]
+            for allocation in stage['top_allocations']:
+                lines.append(f"  {allocation['size_diff'] / 1024:>10.1f} KiB "
+                             f"{allocation['count_diff']:>8} blocks  {allocation['site']}")
+
+        lines += ["", "CUMULATIVE PROFILE PER STAGE", ""]
+        for name, profile in self._profiles.items():
+            stream = io.StringIO()
+            pstats.Stats(profile, stream=stream).sort_stats('cumulative').print_stats(self.top)
+            lines += [f"--- {name} ---", stream.getvalue().strip(), ""]
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _snapshot() -> tracemalloc.Snapshot:
+        # Leave out the profiler's own bookkeeping
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+
+    @staticmethod
+    def _filename(name: str) -> str:
+        return re.sub(r'[^A-Za-z0-9_.-]', '_', name)
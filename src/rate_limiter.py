@@ -0,0 +1,87 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+
+class TokenBucketRateLimiter:
+    """Thread-safe token bucket limiting request rate and requests in flight"""
+
+    def __init__(self, requests_per_second: float = 1.0, burst: Optional[int] = None,
+                 max_in_flight: int = 10):
+        if requests_per_second <= 0:
+            raise ValueError("requests_per_second must be positive")
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+
+        self.rate = float(requests_per_second)
+        self.capacity = float(burst if burst is not None else max(1, int(requests_per_second)))
+        self.max_in_flight = max_in_flight
+
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+
+    def _refill(self, now: float):
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._last_refill = now
+
+    def acquire(self, deadline: Optional[float] = None):
+        """Block until a request slot and a rate token are both available
+
+        With a deadline (time.monotonic() value), raise TimeoutError instead
+        of waiting past it.
+        """
+        if deadline is None:
+            self._in_flight.acquire()
+        elif not self._in_flight.acquire(timeout=max(deadline - time.monotonic(), 0)):
+            raise TimeoutError("No request slot before the deadline")
+        try:
+            while True:
+                with self._lock:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+                if deadline is not None and now + wait > deadline:
+                    raise TimeoutError("No rate token before the deadline")
+                time.sleep(wait)
+        except BaseException:
+            self._in_flight.release()
+            raise
+
+    @contextmanager
+    def slot(self, deadline: Optional[float] = None):
+        """acquire(deadline) for the duration of a with block"""
+        self.acquire(deadline)
+        try:
+            yield self
+        finally:
+            self.release()
+
+    def release(self):
+        """Release the in-flight slot taken by acquire()"""
+        self._in_flight.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
+
+    @classmethod
+    def from_config(cls, config: dict) -> "TokenBucketRateLimiter":
+        """Build a limiter from the api.rate_limit section of config.yaml"""
+        config = config or {}
+        return cls(
+            requests_per_second=config.get('requests_per_second', 1.0),
+            burst=config.get('burst'),
+            max_in_flight=config.get('max_in_flight', 10),
+        )
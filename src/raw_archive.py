@@ -0,0 +1,131 @@
+import glob
+import gzip
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+ROTATION_FORMATS = {
+    'hourly': '%Y%m%d_%H',
+    'daily': '%Y%m%d',
+}
+
+_PART_PATTERN = re.compile(r'weather_raw_(?P<period>[0-9_]+)_(?P<part>\d+)\.ndjson\.gz$')
+
+# Added to every archived line: the time of the append (run) that wrote it,
+# so the runs sharing an hourly or daily file can be told apart again
+RUN_FIELD = '_archive_run'
+
+
+class RawArchive:
+    """Rolling, gzip-compressed NDJSON archive of raw API responses
+
+    Each append writes its responses as one compact JSON line apiece in a
+    single gzip member, so files grow by appending and stay readable as a
+    stream. Every line carries the append's run time (RUN_FIELD), which
+    read_runs() groups on. Files roll over per hour or day and when they
+    exceed max_bytes.
+    """
+
+    def __init__(self, root: str = "data/raw/archive", rotation: str = 'hourly',
+                 max_bytes: int = 64 * 1024 * 1024, compresslevel: int = 6):
+        if rotation not in ROTATION_FORMATS:
+            raise ValueError(f"Unknown rotation {rotation!r}, expected one of {list(ROTATION_FORMATS)}")
+        self.root = root
+        self.rotation = rotation
+        self.max_bytes = max_bytes
+        self.compresslevel = compresslevel
+        self.bytes_written = 0  # compressed bytes appended by this instance
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def append(self, records: List[Dict], when: Optional[datetime] = None) -> str:
+        """Append responses to the current archive file, returning its path"""
+        when = when or datetime.now()
+        run = when.isoformat()
+        lines = ''.join(json.dumps({**record, RUN_FIELD: run}, separators=(',', ':'), ensure_ascii=False) + '\n'
+                        for record in records)
+        with self._lock:
+            filepath = self._current_file(when)
+            size_before = os.path.getsize(filepath) if os.path.exists(filepath) else 0
+            with gzip.open(filepath, 'at', encoding='utf-8', compresslevel=self.compresslevel) as f:
+                f.write(lines)
+            self.bytes_written += os.path.getsize(filepath) - size_before
+        return filepath
+
+    def files(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[str]:
+        """Archive files whose period overlaps [start, end), oldest first"""
+        period_format = ROTATION_FORMATS[self.rotation]
+        first = start.strftime(period_format) if start else None
+        last = end.strftime(period_format) if end else None
+
+        selected = []
+        for filepath in glob.glob(os.path.join(self.root, 'weather_raw_*.ndjson.gz')):
+            match = _PART_PATTERN.search(os.path.basename(filepath))
+            if not match:
+                continue
+            period = match.group('period')
+            if (first and period < first) or (last and period > last):
+                continue
+            selected.append((period, int(match.group('part')), filepath))
+        return [filepath for _, _, filepath in sorted(selected)]
+
+    def iter_records(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                     city: Optional[str] = None) -> Iterator[Dict]:
+        """Yield archived responses one at a time without loading whole files"""
+        for filepath in self.files(start, end):
+            yield from self.read_file(filepath, city)
+
+    @classmethod
+    def read_file(cls, filepath: str, city: Optional[str] = None) -> Iterator[Dict]:
+        """Stream the responses of one archive file, optionally for one city only"""
+        for record in cls._read_lines(filepath, city):
+            record.pop(RUN_FIELD, None)
+            yield record
+
+    @classmethod
+    def read_runs(cls, filepath: str) -> List[Tuple[Optional[datetime], List[Dict]]]:
+        """Responses of one archive file grouped by the run that appended them, oldest first
+
+        Lines written without a run time (older archives) come back as one run
+        with time None.
+        """
+        runs: Dict[Optional[str], List[Dict]] = {}
+        for record in cls._read_lines(filepath):
+            runs.setdefault(record.pop(RUN_FIELD, None), []).append(record)
+        return sorted(((datetime.fromisoformat(run) if run else None, records) for run, records in runs.items()),
+                      key=lambda item: item[0] or datetime.min)
+
+    @staticmethod
+    def _read_lines(filepath: str, city: Optional[str] = None) -> Iterator[Dict]:
+        # Cheap substring test before paying for a full JSON parse, when the
+        # name is written verbatim (no JSON escapes) in the archived line
+        prefilter = city is not None and json.dumps(city, ensure_ascii=False)[1:-1] == city
+        with gzip.open(filepath, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                if prefilter and city not in line:
+                    continue
+                record = json.loads(line)
+                if city is not None and record.get('name') != city \
+                        and record.get('city_config', {}).get('name') != city:
+                    continue
+                yield record
+
+    def _current_file(self, when: datetime) -> str:
+        period = when.strftime(ROTATION_FORMATS[self.rotation])
+        existing = glob.glob(os.path.join(self.root, f'weather_raw_{period}_*.ndjson.gz'))
+        parts = [int(_PART_PATTERN.search(os.path.basename(path)).group('part'))
+                 for path in existing if _PART_PATTERN.search(os.path.basename(path))]
+        part = max(parts) if parts else 0
+
+        filepath = self._path(period, part)
+        if os.path.exists(filepath) and os.path.getsize(filepath) >= self.max_bytes:
+            filepath = self._path(period, part + 1)
+        return filepath
+
+    def _path(self, period: str, part: int) -> str:
+        return os.path.join(self.root, f'weather_raw_{period}_{part:03d}.ndjson.gz')
@@ -0,0 +1,178 @@
+import glob
+import json
+import os
+import re
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from src.data_processor import WeatherDataProcessor
+from src.incremental import ObservationState
+from src.raw_archive import RawArchive
+
+_SNAPSHOT_PATTERN = re.compile(r'weather_data_(\d{8}_\d{6})\.json$')
+_ARCHIVE_PATTERN = re.compile(r'weather_raw_(\d{8})(?:_(\d{2}))?_\d+\.ndjson\.gz$')
+
+# The live pipeline archives a run and stores its history moments apart, so a
+# stored run this close to an archived one is the same run
+MATCH_WINDOW = timedelta(seconds=60)
+
+
+def discover_snapshots(raw_path: str, start: Optional[datetime] = None,
+                       end: Optional[datetime] = None) -> List[Tuple[datetime, str]]:
+    """Find raw snapshot files (JSON dumps and archive parts) in [start, end), oldest first
+
+    An archive part is listed once, at the start of its period; load_runs()
+    splits it into the runs it holds.
+    """
+    snapshots = []
+    for filepath in glob.glob(os.path.join(raw_path, 'weather_data_*.json')):
+        match = _SNAPSHOT_PATTERN.search(os.path.basename(filepath))
+        if match:
+            snapshots.append((datetime.strptime(match.group(1), '%Y%m%d_%H%M%S'), filepath))
+
+    for filepath in glob.glob(os.path.join(raw_path, 'archive', 'weather_raw_*.ndjson.gz')):
+        match = _ARCHIVE_PATTERN.search(os.path.basename(filepath))
+        if match:
+            period = match.group(1) + (match.group(2) or '00')
+            snapshots.append((datetime.strptime(period, '%Y%m%d%H'), filepath))
+
+    return sorted(
+        (when, filepath) for when, filepath in snapshots
+        if (start is None or when >= start) and (end is None or when < end)
+    )
+
+
+def partition_by_day(snapshots: List[Tuple[datetime, str]]) -> Dict[str, List[Tuple[datetime, str]]]:
+    """Group snapshots into per-day work units"""
+    partitions = defaultdict(list)
+    for when, filepath in snapshots:
+        partitions[when.strftime('%Y-%m-%d')].append((when, filepath))
+    return dict(partitions)
+
+
+def load_runs(filepath: str, when: Optional[datetime] = None) -> List[Tuple[Optional[datetime], List[Dict]]]:
+    """(run time, raw responses) of each run in a snapshot file, oldest first
+
+    A JSON dump holds one run; an archive part holds every run appended in
+    its period, split apart by their run times.
+    """
+    if filepath.endswith('.ndjson.gz'):
+        return [(run_time or when, records) for run_time, records in RawArchive.read_runs(filepath)]
+    with open(filepath, 'r') as f:
+        return [(when, json.load(f))]
+
+
+def load_snapshot(filepath: str) -> List[Dict]:
+    """Load the raw responses of one snapshot file; for an archive part, its newest run"""
+    runs = load_runs(filepath)
+    return runs[-1][1] if runs else []
+
+
+def replay_partition(day: str, snapshots: List[Tuple[datetime, str]], data_path: str,
+                     alert_rules: Optional[List[Dict]] = None, incremental: bool = False) -> Dict:
+    """Process, analyse and backfill every snapshot of one day (runs in a worker process)
+
+    Runs go to the live history store unless it already holds a run within
+    MATCH_WINDOW of the archived run time, so a replay only adds the runs the
+    store is missing and replaying again adds nothing. In incremental mode
+    only each run's new observations are stored, as the live pipeline does.
+    """
+    processor = WeatherDataProcessor(data_path, alert_rules=alert_rules, export_csv=False)
+    observations = ObservationState() if incremental else None
+    started = time.perf_counter()
+    first = datetime.strptime(day, '%Y-%m-%d')
+    stored = processor.history.run_times(first - MATCH_WINDOW, first + timedelta(days=1) + MATCH_WINDOW)
+    runs = []
+    records = 0
+    alert_count = 0
+    added = 0
+
+    for when, filepath in snapshots:
+        try:
+            snapshot_runs = load_runs(filepath, when)
+        except (OSError, ValueError) as e:
+            print(f"Error reading snapshot {filepath}: {e}")
+            continue
+
+        for run_time, raw_data in snapshot_runs:
+            if observations is not None:
+                update = observations.update(raw_data, processor.process_current_weather)
+                df, rows = update.snapshot, update.rows
+            else:
+                df = rows = processor.process_current_weather(raw_data)
+            metrics = processor.calculate_metrics(df)
+            alerts = processor.detect_weather_alerts(df)
+            if not any(abs(stored_time - run_time) <= MATCH_WINDOW for stored_time in stored):
+                if processor.history.append(rows, run_time=run_time):
+                    added += 1
+
+            records += len(df)
+            alert_count += len(alerts)
+            runs.append({
+                'snapshot': os.path.basename(filepath),
+                'timestamp': run_time.isoformat(),
+                'metrics': metrics,
+                'alerts': alerts,
+            })
+
+    # One analysis file per replayed day instead of one per snapshot
+    replay_path = os.path.join(processor.processed_path, 'replay')
+    os.makedirs(replay_path, exist_ok=True)
+    analysis_file = os.path.join(replay_path, f"analysis_{day}.json")
+    with open(analysis_file, 'w') as f:
+        json.dump({'date': day, 'replayed_at': datetime.now().isoformat(), 'runs': runs}, f)
+
+    return {
+        'date': day,
+        'snapshots': len(runs),
+        'records': records,
+        'alerts': alert_count,
+        'added': added,
+        'analysis_file': analysis_file,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+class ReplayRunner:
+    """Reprocess archived raw data offline, fanning days out over a process pool
+
+    Runs missing from the live history store are backfilled into it; runs
+    it already holds are analysed again but not stored twice.
+    """
+
+    def __init__(self, data_path: str = "data/", alert_rules: Optional[List[Dict]] = None,
+                 workers: Optional[int] = None, incremental: bool = False):
+        self.data_path = data_path
+        self.raw_path = os.path.join(data_path, "raw")
+        self.alert_rules = alert_rules
+        self.workers = workers or os.cpu_count() or 1
+        self.incremental = incremental
+
+    def run(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[Dict]:
+        """Replay every snapshot in [start, end), returning per-day results"""
+        partitions = partition_by_day(discover_snapshots(self.raw_path, start, end))
+        if not partitions:
+            return []
+
+        results = []
+        if self.workers == 1 or len(partitions) == 1:
+            for day, snapshots in sorted(partitions.items()):
+                results.append(replay_partition(day, snapshots, self.data_path, self.alert_rules,
+                                                self.incremental))
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(partitions))) as executor:
+                futures = {
+                    executor.submit(replay_partition, day, snapshots, self.data_path,
+                                    self.alert_rules, self.incremental): day
+                    for day, snapshots in partitions.items()
+                }
+                for future in as_completed(futures):
+                    try:
+                        results.append(future.result())
+                    except Exception as e:
+                        print(f"Error replaying {futures[future]}: {e}")
+
+        return sorted(results, key=lambda result: result['date'])
@@ -2,19 +2,14 @@
 import json
 import pandas as pd
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
 import os
+from src.artifact_cache import ArtifactCache
+from src.json_writer import StreamingJSONWriter
+from src.telemetry import Telemetry, timed
 
-class ReportGenerator:
-    def __init__(self, output_path: str = "reports/"):
-        self.output_path = output_path
-        os.makedirs(output_path, exist_ok=True)
-    
-    def generate_html_report(self, df: pd.DataFrame, metrics: Dict, alerts: List[Dict]) -> str:
-        """Generate a comprehensive HTML report"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        html_content = f"""
+# Precompiled HTML report fragments; rendering writes them to the file in order
+_HTML_HEAD = """
         <!DOCTYPE html>
         <html>
         <head>
@@ -40,37 +35,35 @@ class ReportGenerator:
                 <h2>Summary Statistics</h2>
                 <div class="metric">
                     <h3>Average Temperature</h3>
-                    <p>{metrics['summary']['avg_temperature']:.1f}°C</p>
+                    <p>{summary[avg_temperature]:.1f}°C</p>
                 </div>
                 <div class="metric">
                     <h3>Temperature Range</h3>
-                    <p>{metrics['summary']['min_temperature']:.1f}°C - {metrics['summary']['max_temperature']:.1f}°C</p>
+                    <p>{summary[min_temperature]:.1f}°C - {summary[max_temperature]:.1f}°C</p>
                 </div>
                 <div class="metric">
                     <h3>Average Humidity</h3>
-                    <p>{metrics['summary']['avg_humidity']:.1f}%</p>
+                    <p>{summary[avg_humidity]:.1f}%</p>
                 </div>
                 <div class="metric">
                     <h3>Average Wind Speed</h3>
-                    <p>{metrics['summary']['avg_wind_speed']:.1f} m/s</p>
+                    <p>{summary[avg_wind_speed]:.1f} m/s</p>
                 </div>
             </div>
             
             <div class="section">
                 <h2>Weather Alerts</h2>
         """
-        
-        if alerts:
-            for alert in alerts:
-                html_content += f"""
+
+_HTML_ALERT = """
                 <div class="alert">
-                    <strong>{alert['city']}</strong>: {alert['message']}
+                    <strong>{city}</strong>: {message}
                 </div>
                 """
-        else:
-            html_content += "<p>No weather alerts at this time.</p>"
-        
-        html_content += """
+
+_HTML_NO_ALERTS = """<p>No weather alerts at this time.</p>"""
+
+_HTML_TABLE_HEAD = """
             </div>
             
             <div class="section">
@@ -88,20 +81,21 @@ class ReportGenerator:
                     </thead>
                     <tbody>
         """
-        
-        for _, row in df.iterrows():
-            html_content += f"""
+
+# Row placeholders are positional, in _HTML_TABLE_COLUMNS order
+_HTML_TABLE_COLUMNS = ('city', 'temperature', 'feels_like', 'humidity', 'wind_speed', 'weather_description')
+_HTML_TABLE_ROW = """
                         <tr>
-                            <td>{row['city']}</td>
-                            <td>{row['temperature']:.1f}</td>
-                            <td>{row['feels_like']:.1f}</td>
-                            <td>{row['humidity']}</td>
-                            <td>{row['wind_speed']:.1f}</td>
-                            <td>{row['weather_description']}</td>
+                            <td>{0}</td>
+                            <td>{1:.1f}</td>
+                            <td>{2:.1f}</td>
+                            <td>{3}</td>
+                            <td>{4:.1f}</td>
+                            <td>{5}</td>
                         </tr>
             """
-        
-        html_content += """
+
+_HTML_TABLE_TAIL = """
                     </tbody>
                 </table>
             </div>
@@ -111,70 +105,240 @@ class ReportGenerator:
                 <h3>Temperature Analysis</h3>
                 <ul>
         """
-        
-        temp_analysis = metrics.get('temperature_analysis', {})
-        html_content += f"""
-                    <li>Hottest city: {temp_analysis.get('hottest_city', 'N/A')}</li>
-                    <li>Coldest city: {temp_analysis.get('coldest_city', 'N/A')}</li>
-                    <li>Temperature range: {temp_analysis.get('temperature_range', 0):.1f}°C</li>
-                    <li>Cities above average temperature: {temp_analysis.get('cities_above_average', 0)}</li>
+
+_HTML_INSIGHTS = """
+                    <li>Hottest city: {hottest_city}</li>
+                    <li>Coldest city: {coldest_city}</li>
+                    <li>Temperature range: {temperature_range:.1f}°C</li>
+                    <li>Cities above average temperature: {cities_above_average}</li>
                 </ul>
                 
                 <h3>Weather Conditions</h3>
                 <ul>
         """
-        
-        weather_analysis = metrics.get('weather_conditions', {})
-        condition_dist = weather_analysis.get('condition_distribution', {})
-        for condition, count in condition_dist.items():
-            html_content += f"<li>{condition}: {count} cities</li>"
-        
-        html_content += """
+
+_HTML_CONDITION = """<li>{condition}: {count} cities</li>"""
+
+_HTML_FOOTER = """
                 </ul>
             </div>
         </body>
         </html>
         """
-        
+
+_HTML_TABLE_NOTE = """
+                        <tr>
+                            <td colspan="6">{note}</td>
+                        </tr>
+            """
+
+_HTML_PAGE_HEAD = """
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <title>Weather Data Analysis Report - Page {page}</title>
+            <style>
+                body {{ font-family: Arial, sans-serif; margin: 20px; }}
+                .data-table {{ width: 100%; border-collapse: collapse; }}
+                .data-table th, .data-table td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
+                .data-table th {{ background-color: #f2f2f2; }}
+            </style>
+        </head>
+        <body>
+            <div>
+                <h1>Weather Data Analysis Report - Page {page}</h1>
+                <p>Generated on: {timestamp}</p>"""
+
+_HTML_PAGE_FOOTER = """
+                    </tbody>
+                </table>
+            </div>
+        </body>
+        </html>
+        """
+
+class ReportGenerator:
+    def __init__(self, output_path: str = "reports/", max_table_rows: Optional[int] = None,
+                 table_sort_by: str = 'severity_score', page_size: Optional[int] = None,
+                 json_mode: str = 'pretty', telemetry: Optional[Telemetry] = None,
+                 artifacts: Optional[ArtifactCache] = None):
+        self.output_path = output_path
+        self.max_table_rows = max_table_rows
+        self.table_sort_by = table_sort_by
+        self.page_size = page_size
+        self.json_mode = json_mode
+        self.telemetry = telemetry or Telemetry()
+        self.artifacts = artifacts or ArtifactCache()
+        # Report kind ('html', 'json') -> whether the latest one was reused from an earlier run
+        self.reused: Dict[str, bool] = {}
+        os.makedirs(output_path, exist_ok=True)
+    
+    @timed('reporter')
+    def generate_html_report(self, df: pd.DataFrame, metrics: Dict, alerts: List[Dict]) -> str:
+        """Generate a comprehensive HTML report, or reuse the one built from identical inputs"""
+        settings = [self.max_table_rows, self.table_sort_by, self.page_size, metrics, alerts]
+        written, cached = self.artifacts.fetch('html_report', df,
+                                               lambda: self._write_html_report(df, metrics, alerts),
+                                               settings=settings, files=lambda written: written)
+        self.reused['html'] = cached
+        if cached:
+            print(f"HTML report unchanged, reusing the one generated by an earlier run: {written[0]}")
+        else:
+            print(f"HTML report generated: {written[0]}")
+        return written[0]
+    
+    def _write_html_report(self, df: pd.DataFrame, metrics: Dict, alerts: List[Dict]) -> List[str]:
+        """Write the report and any extra table pages, returning their paths (report first)"""
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         timestamp_file = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"weather_report_{timestamp_file}.html"
         filepath = os.path.join(self.output_path, filename)
         
+        # Optionally keep only the top-N cities, then split the table into pages
+        table_df = self._select_table_rows(df)
+        page_size = self.page_size or max(len(table_df), 1)
+        pages = [table_df.iloc[i:i + page_size] for i in range(0, len(table_df), page_size)] or [table_df]
+        page_files = [f"weather_report_{timestamp_file}_page{n}.html" for n in range(2, len(pages) + 1)]
+        
         with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+            f.write(_HTML_HEAD.format(timestamp=timestamp, summary=metrics['summary']))
+            
+            if alerts:
+                self._write_chunks(f, (_HTML_ALERT.format(city=alert['city'], message=alert['message'])
+                                       for alert in alerts))
+            else:
+                f.write(_HTML_NO_ALERTS)
+            
+            f.write(_HTML_TABLE_HEAD)
+            self._write_table_rows(f, pages[0])
+            note = self._table_note(len(df), len(table_df), len(pages[0]), page_files)
+            if note:
+                f.write(_HTML_TABLE_NOTE.format(note=note))
+            f.write(_HTML_TABLE_TAIL)
+            
+            temp_analysis = metrics.get('temperature_analysis', {})
+            f.write(_HTML_INSIGHTS.format(
+                hottest_city=temp_analysis.get('hottest_city', 'N/A'),
+                coldest_city=temp_analysis.get('coldest_city', 'N/A'),
+                temperature_range=temp_analysis.get('temperature_range', 0),
+                cities_above_average=temp_analysis.get('cities_above_average', 0)
+            ))
+            
+            weather_analysis = metrics.get('weather_conditions', {})
+            condition_dist = weather_analysis.get('condition_distribution', {})
+            for condition, count in condition_dist.items():
+                f.write(_HTML_CONDITION.format(condition=condition, count=count))
+            
+            f.write(_HTML_FOOTER)
+        
+        for page_number, (page_df, page_file) in enumerate(zip(pages[1:], page_files), start=2):
+            with open(os.path.join(self.output_path, page_file), 'w', encoding='utf-8') as f:
+                f.write(_HTML_PAGE_HEAD.format(page=page_number, timestamp=timestamp))
+                f.write(_HTML_TABLE_HEAD)
+                self._write_table_rows(f, page_df)
+                f.write(_HTML_TABLE_NOTE.format(note=f'<a href="{filename}">Back to report</a>'))
+                f.write(_HTML_PAGE_FOOTER)
         
-        print(f"HTML report generated: {filepath}")
+        written = [filepath] + [os.path.join(self.output_path, page_file) for page_file in page_files]
+        self.telemetry.record_count('reporter', 'generate_html_report', len(table_df))
+        for path in written:
+            self.telemetry.record_file('reporter', path)
+        return written
+    
+    def _select_table_rows(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Apply the top-N limit to the city table, ranked by table_sort_by"""
+        if not self.max_table_rows or len(df) <= self.max_table_rows:
+            return df
+        if self.table_sort_by in df.columns:
+            return df.nlargest(self.max_table_rows, self.table_sort_by)
+        return df.head(self.max_table_rows)
+    
+    def _table_note(self, total: int, selected: int, shown: int, page_files: List[str]) -> Optional[str]:
+        """Describe truncation and pagination of the city table, if any"""
+        if shown == total:
+            return None
+        note = f"Showing {shown} of {total} cities"
+        if selected < total:
+            note += f" (top {selected} by {self.table_sort_by})"
+        if page_files:
+            links = ' '.join(f'<a href="{page_file}">{n}</a>' for n, page_file in enumerate(page_files, start=2))
+            note += f". More pages: {links}"
+        return note
+    
+    def _write_table_rows(self, f, df: pd.DataFrame):
+        """Render table rows from column arrays and stream them to the file"""
+        columns = [df[column].tolist() for column in _HTML_TABLE_COLUMNS]
+        self._write_chunks(f, (_HTML_TABLE_ROW.format(*values) for values in zip(*columns)))
+    
+    def _write_chunks(self, f, fragments, chunk_size: int = 1000):
+        """Write rendered fragments in batches instead of building one large string"""
+        chunk = []
+        for fragment in fragments:
+            chunk.append(fragment)
+            if len(chunk) >= chunk_size:
+                f.write(''.join(chunk))
+                chunk = []
+        if chunk:
+            f.write(''.join(chunk))
+    
+    @timed('reporter')
+    def generate_json_report(self, df: pd.DataFrame, metrics: Dict, alerts: List[Dict],
+                             mode: Optional[str] = None) -> str:
+        """Generate a JSON report for API consumption
+
+        mode is 'pretty' (indented), 'compact', or 'ndjson' (a report header
+        line followed by one line per city); it defaults to self.json_mode.
+        """
+        mode = mode or self.json_mode
+        if mode not in ('pretty', 'compact', 'ndjson'):
+            raise ValueError(f"Unknown JSON report mode: {mode}")
+        
+        filepath, cached = self.artifacts.fetch('json_report', df,
+                                                lambda: self._write_json_report(df, metrics, alerts, mode),
+                                                settings=[mode, metrics, alerts], files=lambda path: [path],
+                                                rendered=('timestamp',))  # city_data includes fetch times
+        self.reused['json'] = cached
+        if cached:
+            print(f"JSON report unchanged, reusing the one generated by an earlier run: {filepath}")
+        else:
+            print(f"JSON report generated: {filepath}")
         return filepath
     
-    def generate_json_report(self, df: pd.DataFrame, metrics: Dict, alerts: List[Dict]) -> str:
-        """Generate a JSON report for API consumption"""
-        report_data = {
-            'timestamp': datetime.now().isoformat(),
-            'summary': metrics.get('summary', {}),
-            'analysis': {
+    def _write_json_report(self, df: pd.DataFrame, metrics: Dict, alerts: List[Dict], mode: str) -> str:
+        report_items = [
+            ('timestamp', datetime.now().isoformat()),
+            ('summary', metrics.get('summary', {})),
+            ('analysis', {
                 'temperature': metrics.get('temperature_analysis', {}),
                 'weather_conditions': metrics.get('weather_conditions', {}),
                 'wind': metrics.get('wind_analysis', {}),
                 'humidity': metrics.get('humidity_analysis', {})
-            },
-            'alerts': alerts,
-            'city_data': df.to_dict('records'),
-            'total_cities_analyzed': len(df),
-            'report_metadata': {
+            }),
+            ('alerts', alerts),
+            ('city_data', df),
+            ('total_cities_analyzed', len(df)),
+            ('report_metadata', {
                 'data_source': 'OpenWeatherMap API',
                 'analysis_type': 'Real-time Weather Analysis',
                 'report_version': '1.0'
-            }
-        }
+            })
+        ]
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"weather_report_{timestamp}.json"
+        extension = 'ndjson' if mode == 'ndjson' else 'json'
+        filename = f"weather_report_{timestamp}.{extension}"
         filepath = os.path.join(self.output_path, filename)
         
+        # City records are serialised straight from column buffers and streamed
         with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(report_data, f, indent=2, ensure_ascii=False)
+            writer = StreamingJSONWriter(f, indent=2 if mode == 'pretty' else None)
+            if mode == 'ndjson':
+                writer.write_ndjson(dict(item for item in report_items if item[0] != 'city_data'), df)
+            else:
+                writer.write_object(report_items)
         
-        print(f"JSON report generated: {filepath}")
+        self.telemetry.record_count('reporter', 'generate_json_report', len(df))
+        self.telemetry.record_file('reporter', filepath)
         return filepath
     
     def generate_summary_text(self, metrics: Dict, alerts: List[Dict]) -> str:
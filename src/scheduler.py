@@ -0,0 +1,113 @@
+import math
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+OVERLAP_POLICIES = ('skip', 'coalesce')
+
+
+@dataclass
+class SchedulerStats:
+    runs: int = 0
+    failures: int = 0
+    overruns: int = 0  # runs that were still going when the next tick came
+    skipped: int = 0  # ticks dropped under the 'skip' policy
+    coalesced: int = 0  # ticks folded into one catch-up run under 'coalesce'
+    max_lateness: float = 0.0  # seconds between a tick and the start of its run
+    last_duration: float = 0.0
+
+
+class AlignedScheduler:
+    """Run a job on wall-clock-aligned ticks, one run at a time
+
+    Ticks fall on multiples of `interval` seconds since the epoch (plus
+    `offset`), so a 15-minute schedule fires at :00, :15, :30 and :45
+    however long each run takes, and runs never drift. The job runs in the
+    scheduler's thread, so cycles cannot overlap. Ticks that pass while a run
+    is still going are either skipped (wait for the next aligned tick) or
+    coalesced into a single immediate catch-up run. Between runs the thread
+    sleeps until the next deadline; stop() wakes it.
+    """
+
+    def __init__(self, job: Callable[[float], Any], interval: float, offset: float = 0.0,
+                 overlap: str = 'skip', clock: Callable[[], float] = time.time):
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        if overlap not in OVERLAP_POLICIES:
+            raise ValueError(f"Unknown overlap policy {overlap!r}, expected one of {OVERLAP_POLICIES}")
+        self.job = job
+        self.interval = interval
+        self.offset = offset % interval
+        self.overlap = overlap
+        self.clock = clock
+        self.stats = SchedulerStats()
+        self._stop = threading.Event()
+
+    def tick_index(self, when: float) -> int:
+        """Number of the last aligned tick at or before `when`"""
+        return math.floor((when - self.offset) / self.interval)
+
+    def tick_time(self, index: int) -> float:
+        return index * self.interval + self.offset
+
+    def next_tick(self, now: Optional[float] = None) -> float:
+        """First aligned tick strictly after now"""
+        now = self.clock() if now is None else now
+        return self.tick_time(self.tick_index(now) + 1)
+
+    def run(self, run_immediately: bool = False):
+        """Run until stop(); the first run is at the next tick, or now if run_immediately"""
+        self._stop.clear()
+        now = self.clock()
+        if run_immediately:
+            index, tick = self.tick_index(now), now
+        else:
+            index = self.tick_index(now) + 1
+            tick = self.tick_time(index)
+        while self._sleep_until(tick):
+            self._run_job(tick)
+
+            # Ticks are tracked by index so catch-up arithmetic stays exact
+            current = self.tick_index(self.clock())
+            missed = current - index
+            if missed > 0:
+                self.stats.overruns += 1
+                if self.overlap == 'coalesce':
+                    # One catch-up run right away stands in for every missed tick
+                    self.stats.coalesced += missed
+                    index = current
+                    tick = self.tick_time(index)
+                    continue
+                self.stats.skipped += missed
+            index = current + 1
+            tick = self.tick_time(index)
+
+    def stop(self):
+        self._stop.set()
+
+    def _run_job(self, tick: float):
+        started = self.clock()
+        self.stats.max_lateness = max(self.stats.max_lateness, started - tick)
+        try:
+            self.job(tick)
+        except Exception:
+            self.stats.failures += 1
+            traceback.print_exc()
+        finally:
+            self.stats.runs += 1
+            self.stats.last_duration = self.clock() - started
+
+    def _sleep_until(self, deadline: float) -> bool:
+        """Sleep until the wall clock reaches deadline; False if stopped first
+
+        Sleeps in bounded chunks and re-reads the clock, so a wall-clock step
+        (NTP, suspend) does not leave the scheduler asleep past its tick.
+        """
+        while not self._stop.is_set():
+            remaining = deadline - self.clock()
+            if remaining <= 0:
+                return True
+            self._stop.wait(min(remaining, 60.0))
+        return False
@@ -0,0 +1,210 @@
+import gzip
+import json
+import multiprocessing
+import os
+import shutil
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+SHARD_MODES = ('local', 'shared')
+
+
+def shard_of(city: Dict, shards: int) -> int:
+    """Stable shard index of a city config; unchanged across runs, hosts and Python versions"""
+    key = f"{city['name'].strip().lower()}|{round(float(city['lat']), 4)}|{round(float(city['lon']), 4)}"
+    return zlib.crc32(key.encode('utf-8')) % shards
+
+
+def partition_cities(cities: List[Dict], shards: int) -> List[List[Dict]]:
+    """Split the city catalog into `shards` lists, keeping catalog order within each"""
+    partitions = [[] for _ in range(shards)]
+    for city in cities:
+        partitions[shard_of(city, shards)].append(city)
+    return partitions
+
+
+def run_id(interval: float, when: Optional[float] = None) -> str:
+    """Name of the collection slot `when` falls in; every node computes the same one"""
+    when = time.time() if when is None else when
+    return time.strftime('%Y%m%dT%H%M%S', time.gmtime(when // interval * interval))
+
+
+def shard_file(run_path: str, index: int, shards: int) -> str:
+    return os.path.join(run_path, f"shard-{index:03d}-of-{shards:03d}.ndjson.gz")
+
+
+def shard_overrides(workers: List[Dict], index: int) -> Dict:
+    """API settings for one shard: its api_key (or the env var named by api_key_env) and rate_limit"""
+    spec = dict(workers[index]) if index < len(workers) else {}
+    api_key_env = spec.pop('api_key_env', None)
+    if api_key_env:
+        spec['api_key'] = os.getenv(api_key_env) or spec.get('api_key')
+    return {key: value for key, value in spec.items() if value is not None}
+
+
+def collect_shard(config_path: str, index: int, shards: int, run_path: str,
+                  workers: Optional[List[Dict]] = None, cities: Optional[List[Dict]] = None) -> str:
+    """Collect one shard's cities with its own API key and rate limit into run_path
+
+    `cities` replaces the shard's partition of the configured cities. The
+    file appears atomically once the shard is complete, so a coordinator
+    (local or on another node) can treat its existence as done.
+    """
+    from src.weather_api import WeatherAPI
+
+    api = WeatherAPI(config_path, api_overrides=shard_overrides(workers or [], index))
+    if cities is None:
+        cities = partition_cities(api.config['cities'], shards)[index]
+    collected = api.get_multiple_cities_weather(cities=cities) if cities else []
+
+    os.makedirs(run_path, exist_ok=True)
+    filepath = shard_file(run_path, index, shards)
+    tmp_path = f"{filepath}.{os.getpid()}.tmp"
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+        for record in collected:
+            f.write(json.dumps(record, separators=(',', ':')) + '\n')
+    os.replace(tmp_path, filepath)
+    return filepath
+
+
+@dataclass
+class ShardReport:
+    """What each shard contributed to one merged collection"""
+    run_id: str
+    collected: Dict[int, int] = field(default_factory=dict)  # shard -> records
+    failed: Dict[int, str] = field(default_factory=dict)  # shard -> error or 'timed out'
+    missed_cities: List[str] = field(default_factory=list)
+
+
+class ShardCoordinator:
+    """Collect the city catalog as N shards and merge their outputs
+
+    Cities map to shards by a stable hash of name and coordinates. In 'local'
+    mode the coordinator runs every shard in its own process; in 'shared'
+    mode shard workers on other nodes (`main.py shard <index>`) write into
+    the shared directory and the coordinator waits for them. Outputs of one
+    collection slot go to <shared_path>/<run id>/ and are merged, in catalog
+    order, into the payload list the rest of the pipeline processes.
+    """
+
+    def __init__(self, config_path: str, cities: List[Dict], shards: int, mode: str = 'local',
+                 shared_path: str = "data/shards/", workers: Optional[List[Dict]] = None,
+                 interval: float = 300, wait_timeout: float = 120):
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        if mode not in SHARD_MODES:
+            raise ValueError(f"Unknown shard mode {mode!r}, expected one of {SHARD_MODES}")
+        self.config_path = config_path
+        self.cities = cities
+        self.shards = shards
+        self.mode = mode
+        self.shared_path = shared_path
+        self.workers = workers or []
+        self.interval = interval
+        self.wait_timeout = wait_timeout
+        self.last_report: Optional[ShardReport] = None
+
+    @classmethod
+    def from_config(cls, config: dict, config_path: str) -> Optional["ShardCoordinator"]:
+        """Coordinator for the sharding section of config.yaml, or None when not sharded"""
+        sharding = config.get('sharding', {}) or {}
+        shards = sharding.get('shards', 1)
+        if shards <= 1:
+            return None
+        return cls(
+            config_path,
+            config['cities'],
+            shards,
+            mode=sharding.get('mode', 'local'),
+            shared_path=sharding.get('shared_path', "data/shards/"),
+            workers=sharding.get('workers'),
+            interval=config.get('data', {}).get('update_interval', 300),
+            wait_timeout=sharding.get('wait_timeout', 120),
+        )
+
+    def run_path(self, slot: Optional[str] = None) -> str:
+        return os.path.join(self.shared_path, slot or run_id(self.interval))
+
+    def collect_worker(self, index: int) -> str:
+        """Run one shard in this process (a worker node in 'shared' mode)"""
+        if not 0 <= index < self.shards:
+            raise ValueError(f"Shard index {index} out of range for {self.shards} shards")
+        return collect_shard(self.config_path, index, self.shards, self.run_path(), self.workers)
+
+    def collect(self, cities: Optional[List[Dict]] = None) -> List[Dict]:
+        """Collect every shard for the current slot and return the merged payloads
+
+        Given `cities` (a staggered slot, or the cities near a point), only
+        those are returned. Local shards then fetch just their part of the
+        subset; shared workers collect their whole shard, which is filtered here.
+        """
+        subset = cities
+        cities = self.cities if subset is None else subset
+        slot = run_id(self.interval)
+        run_path = self.run_path(slot)
+        report = ShardReport(slot)
+        if self.mode == 'local':
+            self._run_local(run_path, report, subset)
+        else:
+            self._wait_shared(run_path, report)
+
+        merged = []
+        for index in range(self.shards):
+            filepath = shard_file(run_path, index, self.shards)
+            if index in report.failed or not os.path.exists(filepath):
+                report.failed.setdefault(index, 'no output')
+                continue
+            with gzip.open(filepath, 'rt', encoding='utf-8') as f:
+                records = [json.loads(line) for line in f if line.strip()]
+            report.collected[index] = len(records)
+            merged.extend(records)
+
+        # Catalog order, as an unsharded collection would return
+        position = {city['name']: i for i, city in enumerate(cities)}
+        if subset is not None:
+            merged = [record for record in merged if record.get('city_config', {}).get('name') in position]
+        merged.sort(key=lambda record: position.get(record.get('city_config', {}).get('name'), len(position)))
+        names = {record.get('city_config', {}).get('name') for record in merged}
+        report.missed_cities = [city['name'] for city in cities if city['name'] not in names]
+        self.last_report = report
+        self._remove_old_runs(slot)
+        return merged
+
+    def _run_local(self, run_path: str, report: ShardReport, cities: Optional[List[Dict]] = None):
+        # Spawned, not forked: the caller is usually a pipeline thread
+        context = multiprocessing.get_context('spawn')
+        partitions = partition_cities(cities, self.shards) if cities is not None else [None] * self.shards
+        with ProcessPoolExecutor(max_workers=self.shards, mp_context=context) as executor:
+            futures = {index: executor.submit(collect_shard, self.config_path, index, self.shards,
+                                              run_path, self.workers, partitions[index])
+                       for index in range(self.shards)}
+            for index, future in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    report.failed[index] = f"{type(e).__name__}: {e}"
+
+    def _wait_shared(self, run_path: str, report: ShardReport):
+        deadline = time.monotonic() + self.wait_timeout
+        pending = set(range(self.shards))
+        while pending:
+            pending = {index for index in pending
+                       if not os.path.exists(shard_file(run_path, index, self.shards))}
+            if not pending or time.monotonic() >= deadline:
+                break
+            time.sleep(min(1.0, max(deadline - time.monotonic(), 0)))
+        for index in pending:
+            report.failed[index] = 'timed out'
+
+    def _remove_old_runs(self, current: str):
+        """Drop the outputs of earlier slots; later slots may already be in progress"""
+        try:
+            slots = os.listdir(self.shared_path)
+        except OSError:
+            return
+        for slot in slots:
+            if slot < current:
+                shutil.rmtree(os.path.join(self.shared_path, slot), ignore_errors=True)
@@ -0,0 +1,145 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# (main, description, weight) of generated conditions
+CONDITIONS = (
+    ('Clear', 'clear sky', 0.35),
+    ('Clouds', 'scattered clouds', 0.30),
+    ('Rain', 'light rain', 0.15),
+    ('Drizzle', 'drizzle', 0.05),
+    ('Thunderstorm', 'thunderstorm', 0.05),
+    ('Snow', 'light snow', 0.05),
+    ('Mist', 'mist', 0.05),
+)
+
+COUNTRIES = ('US', 'GB', 'JP', 'IN', 'BR', 'DE', 'AU', 'ZA', 'CA', 'MX')
+
+
+def synthetic_cities(count: int, seed: int = 0) -> List[Dict]:
+    """City configs (name, lat, lon, country) spread over the globe"""
+    rng = np.random.default_rng(seed)
+    latitudes = np.round(np.degrees(np.arcsin(rng.uniform(-0.97, 0.97, count))), 4)
+    longitudes = np.round(rng.uniform(-180, 180, count), 4)
+    countries = rng.choice(COUNTRIES, count)
+    return [
+        {'name': f"City {i:07d}", 'lat': lat, 'lon': lon, 'country': country}
+        for i, (lat, lon, country) in enumerate(zip(latitudes.tolist(), longitudes.tolist(), countries.tolist()))
+    ]
+
+
+def synthetic_current_weather(count: int, seed: int = 0, when: Optional[datetime] = None,
+                              cities: Optional[List[Dict]] = None) -> List[Dict]:
+    """Current-weather payloads shaped like OpenWeatherMap responses, reproducible per seed
+
+    Values are drawn so the alert rules and indices see a realistic mix of
+    normal and extreme conditions.
+    """
+    when = when or datetime.now()
+    cities = cities if cities is not None else synthetic_cities(count, seed)
+    count = len(cities)
+    rng = np.random.default_rng(seed + 1)
+
+    latitudes = np.array([city['lat'] for city in cities], dtype=float)
+    temperature = np.round(28 - 0.45 * np.abs(latitudes) + rng.normal(0, 6, count), 2)
+    feels_like = np.round(temperature + rng.normal(0, 2, count), 2)
+    humidity = rng.integers(10, 101, count)
+    pressure = np.round(rng.normal(1013, 9, count)).astype(int)
+    visibility = rng.choice([10000, 8000, 5000, 2000, 500], count, p=[0.7, 0.1, 0.1, 0.06, 0.04])
+    wind_speed = np.round(rng.gamma(2.0, 2.2, count), 2)
+    wind_direction = rng.integers(0, 360, count)
+    cloudiness = rng.integers(0, 101, count)
+    weights = np.array([weight for _, _, weight in CONDITIONS])
+    conditions = rng.choice(len(CONDITIONS), count, p=weights / weights.sum())
+
+    # Python scalars up front: cheaper than indexing NumPy arrays per record
+    temperature, feels_like, humidity, pressure, visibility, wind_speed, wind_direction, cloudiness, conditions = (
+        array.tolist() for array in (temperature, feels_like, humidity, pressure, visibility,
+                                     wind_speed, wind_direction, cloudiness, conditions)
+    )
+    dt = int(when.timestamp())
+    timestamp = when.isoformat()
+    records = []
+    for i, city in enumerate(cities):
+        main, description, _ = CONDITIONS[conditions[i]]
+        records.append({
+            'coord': {'lon': city['lon'], 'lat': city['lat']},
+            'weather': [{'main': main, 'description': description}],
+            'main': {
+                'temp': temperature[i],
+                'feels_like': feels_like[i],
+                'humidity': humidity[i],
+                'pressure': pressure[i],
+            },
+            'visibility': visibility[i],
+            'wind': {'speed': wind_speed[i], 'deg': wind_direction[i]},
+            'clouds': {'all': cloudiness[i]},
+            'dt': dt,
+            'sys': {'country': city.get('country', 'US'), 'sunrise': dt - 6 * 3600, 'sunset': dt + 6 * 3600},
+            'id': i,
+            'name': city['name'],
+            'timestamp': timestamp,
+            'city_config': city,
+        })
+    return records
+
+
+def synthetic_forecast(count: int, steps: int = 40, seed: int = 0, when: Optional[datetime] = None,
+                       cities: Optional[List[Dict]] = None) -> List[Dict]:
+    """Forecast payloads (3-hour steps) shaped like OpenWeatherMap /forecast responses"""
+    when = when or datetime.now()
+    cities = cities if cities is not None else synthetic_cities(count, seed)
+    count = len(cities)
+    rng = np.random.default_rng(seed + 2)
+    size = (count, steps)
+
+    latitudes = np.array([city['lat'] for city in cities], dtype=float)[:, None]
+    hours = np.arange(steps)[None, :] * 3
+    temperature = np.round(28 - 0.45 * np.abs(latitudes) + 5 * np.sin(hours * np.pi / 12)
+                           + rng.normal(0, 2, size), 2)
+    feels_like = np.round(temperature + rng.normal(0, 2, size), 2)
+    humidity = rng.integers(10, 101, size)
+    pressure = np.round(rng.normal(1013, 9, size)).astype(int)
+    wind_speed = np.round(rng.gamma(2.0, 2.2, size), 2)
+    wind_direction = rng.integers(0, 360, size)
+    cloudiness = rng.integers(0, 101, size)
+    pop = np.round(rng.uniform(0, 1, size), 2)
+    weights = np.array([weight for _, _, weight in CONDITIONS])
+    conditions = rng.choice(len(CONDITIONS), size, p=weights / weights.sum())
+
+    temperature, feels_like, humidity, pressure, wind_speed, wind_direction, cloudiness, pop, conditions = (
+        array.tolist() for array in (temperature, feels_like, humidity, pressure,
+                                     wind_speed, wind_direction, cloudiness, pop, conditions)
+    )
+    start = int(when.timestamp()) // 10800 * 10800 + 10800
+    forecasts = []
+    for i, city in enumerate(cities):
+        entries = []
+        for step in range(steps):
+            main, description, _ = CONDITIONS[conditions[i][step]]
+            entries.append({
+                'dt': start + step * 10800,
+                'main': {
+                    'temp': temperature[i][step],
+                    'feels_like': feels_like[i][step],
+                    'humidity': humidity[i][step],
+                    'pressure': pressure[i][step],
+                },
+                'weather': [{'main': main, 'description': description}],
+                'clouds': {'all': cloudiness[i][step]},
+                'wind': {'speed': wind_speed[i][step], 'deg': wind_direction[i][step]},
+                'visibility': 10000,
+                'pop': pop[i][step],
+            })
+        forecasts.append({
+            'cnt': steps,
+            'list': entries,
+            'city': {
+                'name': city['name'],
+                'country': city.get('country', 'US'),
+                'coord': {'lat': city['lat'], 'lon': city['lon']},
+            },
+            'city_config': city,
+        })
+    return forecasts
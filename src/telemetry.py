@@ -0,0 +1,234 @@
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+# Request latency buckets in seconds (upper bounds; +Inf is implicit)
+DEFAULT_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# name -> (Prometheus type, help text)
+METRICS = {
+    'weather_run_duration_seconds': ('gauge', 'Wall-clock time of the analysis run'),
+    'weather_stage_duration_seconds': ('gauge', 'Wall-clock time of each pipeline stage'),
+    'weather_stage_success': ('gauge', 'Whether each pipeline stage that ran succeeded (1) or failed (0)'),
+    'weather_stage_skipped': ('gauge', 'Pipeline stages that did not run, by reason (skip or upstream)'),
+    'weather_operation_seconds_total': ('counter', 'Time spent in component operations'),
+    'weather_operation_calls_total': ('counter', 'Calls of component operations'),
+    'weather_records_total': ('counter', 'Records handled by component operations'),
+    'weather_bytes_written_total': ('counter', 'Bytes written to output files'),
+    'weather_files_written_total': ('counter', 'Output files written'),
+    'weather_api_requests_total': ('counter', 'HTTP requests sent to the weather API, by outcome'),
+    'weather_api_cache_total': ('counter', 'Response cache lookups, by result'),
+    'weather_api_request_duration_seconds': ('histogram', 'Weather API request latency'),
+}
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def timed(component: str):
+    """Method decorator recording call count and time under (component, method name)
+
+    The instance's `telemetry` attribute is checked on every call, so a
+    disabled registry costs one attribute lookup.
+    """
+    def decorate(func):
+        operation = func.__name__
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            telemetry = self.telemetry
+            if not telemetry.enabled:
+                return func(self, *args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                telemetry.record_operation(component, operation, time.perf_counter() - started)
+        return wrapper
+    return decorate
+
+
+class Telemetry:
+    """Per-run counters, gauges and latency histograms, exported as Prometheus text and JSON
+
+    Every recording method returns immediately when disabled. export() writes
+    <output_path>/weather.prom (replaced atomically each run, for a node
+    exporter textfile collector) and a run_<timestamp>.json summary, then
+    resets the registry for the next run.
+    """
+
+    def __init__(self, enabled: bool = False, output_path: str = "data/metrics/",
+                 latency_buckets: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS):
+        self.enabled = enabled
+        self.output_path = output_path
+        self.latency_buckets = tuple(sorted(latency_buckets))
+        self._lock = threading.Lock()
+        self.reset()
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict]) -> 'Telemetry':
+        """Build from the `telemetry` config section; disabled when absent"""
+        config = config or {}
+        return cls(
+            enabled=config.get('enabled', False),
+            output_path=config.get('output_path', "data/metrics/"),
+            latency_buckets=tuple(config.get('latency_buckets', DEFAULT_LATENCY_BUCKETS))
+        )
+
+    def reset(self):
+        """Start a new run"""
+        with self._lock:
+            self.started = datetime.now()
+            self._values: Dict[LabelKey, float] = {}
+            self._histograms: Dict[LabelKey, list] = {}
+
+    def increment(self, name: str, value: float = 1, **labels):
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._values[self._key(name, labels)] = value
+
+    def observe(self, name: str, value: float, **labels):
+        """Add a value to a histogram: [per-bucket counts..., sum, count]"""
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        bucket = bisect_left(self.latency_buckets, value)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [0] * (len(self.latency_buckets) + 3)
+            histogram[bucket] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+
+    def record_operation(self, component: str, operation: str, seconds: float, records: Optional[int] = None):
+        if not self.enabled:
+            return
+        self.increment('weather_operation_seconds_total', seconds, component=component, operation=operation)
+        self.increment('weather_operation_calls_total', component=component, operation=operation)
+        if records is not None:
+            self.record_count(component, operation, records)
+
+    def record_count(self, component: str, operation: str, records: int):
+        self.increment('weather_records_total', records, component=component, operation=operation)
+
+    def record_file(self, component: str, filepath: Optional[str], nbytes: Optional[int] = None):
+        """Count an output file; its size is read from disk unless given"""
+        if not self.enabled or not filepath:
+            return
+        if nbytes is None:
+            try:
+                nbytes = os.path.getsize(filepath)
+            except OSError:
+                return
+        self.increment('weather_bytes_written_total', nbytes, component=component)
+        self.increment('weather_files_written_total', component=component)
+
+    def record_request(self, endpoint: str, outcome: str, seconds: float):
+        if not self.enabled:
+            return
+        self.increment('weather_api_requests_total', endpoint=endpoint, outcome=outcome)
+        self.observe('weather_api_request_duration_seconds', seconds, endpoint=endpoint)
+
+    def record_pipeline(self, run):
+        """Record stage durations and outcomes of a PipelineRun"""
+        if not self.enabled:
+            return
+        for result in run.results.values():
+            self.set_gauge('weather_stage_duration_seconds', result.seconds, stage=result.name)
+            if result.status == 'skipped':
+                # Not a failure: the stage raised SkipStage, or something upstream did not run
+                reason = 'skip' if result.error is not None else 'upstream'
+                self.set_gauge('weather_stage_skipped', 1, stage=result.name, reason=reason)
+            else:
+                self.set_gauge('weather_stage_success', 1 if result.status == 'ok' else 0, stage=result.name)
+        self.set_gauge('weather_run_duration_seconds', run.elapsed)
+
+    def to_prometheus(self) -> str:
+        """Render the registry in the Prometheus text exposition format"""
+        with self._lock:
+            values = dict(self._values)
+            histograms = {key: list(histogram) for key, histogram in self._histograms.items()}
+
+        lines = []
+        for name, (metric_type, help_text) in METRICS.items():
+            if metric_type == 'histogram':
+                series = sorted((key, value) for key, value in histograms.items() if key[0] == name)
+            else:
+                series = sorted((key, value) for key, value in values.items() if key[0] == name)
+            if not series:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for (_, labels), value in series:
+                if metric_type == 'histogram':
+                    cumulative = 0
+                    for bound, count in zip(self.latency_buckets + (float('inf'),), value):
+                        cumulative += count
+                        le = '+Inf' if bound == float('inf') else repr(bound)
+                        lines.append(f"{name}_bucket{self._labels(labels + (('le', le),))} {cumulative}")
+                    lines.append(f"{name}_sum{self._labels(labels)} {value[-2]!r}")
+                    lines.append(f"{name}_count{self._labels(labels)} {value[-1]}")
+                else:
+                    lines.append(f"{name}{self._labels(labels)} {value!r}")
+        return '\n'.join(lines) + '\n'
+
+    def summary(self) -> Dict:
+        """JSON-friendly view of the run: metric -> list of {labels, value}"""
+        with self._lock:
+            values = dict(self._values)
+            histograms = {key: list(histogram) for key, histogram in self._histograms.items()}
+
+        metrics = {}
+        for (name, labels), value in sorted(values.items()):
+            metrics.setdefault(name, []).append({'labels': dict(labels), 'value': value})
+        for (name, labels), histogram in sorted(histograms.items()):
+            metrics.setdefault(name, []).append({
+                'labels': dict(labels),
+                'buckets': dict(zip([repr(bound) for bound in self.latency_buckets] + ['+Inf'], histogram[:-2])),
+                'sum': histogram[-2],
+                'count': histogram[-1],
+            })
+        return {'started': self.started.isoformat(), 'finished': datetime.now().isoformat(), 'metrics': metrics}
+
+    def export(self) -> Optional[Tuple[str, str]]:
+        """Write the Prometheus text file and the run's JSON summary, then reset"""
+        if not self.enabled:
+            return None
+        os.makedirs(self.output_path, exist_ok=True)
+
+        prom_path = os.path.join(self.output_path, 'weather.prom')
+        tmp_path = prom_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, prom_path)
+
+        json_path = os.path.join(self.output_path, f"run_{self.started.strftime('%Y%m%d_%H%M%S')}.json")
+        with open(json_path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+
+        self.reset()
+        return prom_path, json_path
+
+    @staticmethod
+    def _key(name: str, labels: Dict) -> LabelKey:
+        return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    @staticmethod
+    def _labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+        if not labels:
+            return ''
+        escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+        return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + '}'
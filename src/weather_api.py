@@ -1,25 +1,143 @@
 ```python
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import time
+import random
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 import yaml
 import os
 from dotenv import load_dotenv
+from src.rate_limiter import TokenBucketRateLimiter
+from src.cache import ResponseCache
+from src.collector import DeadlineCollector
+from src.telemetry import Telemetry, timed
+from src.city_catalog import CityCatalog
 
 load_dotenv()
 
 class WeatherAPI:
-    def __init__(self, config_path: str = "config/config.yaml"):
+    def __init__(self, config_path: str = "config/config.yaml", api_overrides: Optional[Dict] = None):
+        self.config_path = config_path
         with open(config_path, 'r') as file:
             self.config = yaml.safe_load(file)
         
-        self.api_key = os.getenv('OPENWEATHER_API_KEY', self.config['api']['api_key'])
+        # Overrides (e.g. one shard's key and rate limit) take precedence over the environment
+        api_overrides = api_overrides or {}
+        self.config['api'].update(api_overrides)
+        self.api_key = api_overrides.get('api_key') or os.getenv('OPENWEATHER_API_KEY', self.config['api']['api_key'])
         self.base_url = self.config['api']['openweather_url']
         self.forecast_url = self.config['api']['forecast_url']
         
-    def get_current_weather(self, city: str = None, lat: float = None, lon: float = None) -> Dict:
+        # Shared rate limiter and pooled HTTP session for all requests
+        self.rate_limiter = TokenBucketRateLimiter.from_config(self.config['api'].get('rate_limit'))
+        self.concurrent = self.config['api'].get('concurrent', True)
+        self.session = self._create_session(self.rate_limiter.max_in_flight)
+        
+        # Per-request (connect, read) timeouts and bounded retries
+        timeouts = self.config['api'].get('timeouts', {})
+        self.timeout = (timeouts.get('connect', 3.05), timeouts.get('read', 10))
+        retries = self.config['api'].get('retries', {})
+        self.max_attempts = retries.get('max_attempts', 3)
+        self.backoff_base = retries.get('backoff_base', 0.5)
+        self.backoff_max = retries.get('backoff_max', 8)
+        self.last_missed_cities = []
+        
+        # Response cache with TTL from data.update_interval
+        data_config = self.config.get('data', {})
+        cache_enabled = data_config.get('cache', {}).get('enabled', True)
+        self.cache = ResponseCache.from_config(data_config) if cache_enabled else None
+        
+        # Per-run metrics shared with the other components; no-op unless enabled
+        self.telemetry = Telemetry.from_config(self.config.get('telemetry'))
+
+        # A city catalog file replaces the inline cities list
+        self.catalog = None
+        catalog_config = self.config.get('catalog', {}) or {}
+        if catalog_config.get('path'):
+            self.catalog = CityCatalog.open(catalog_config['path'], catalog_config.get('cell_degrees', 1.0))
+            selected = self.catalog.select(near=catalog_config.get('near'), bbox=catalog_config.get('bbox'))
+            self.config['cities'] = self.catalog.to_configs(selected)
+
+    def city_catalog(self) -> CityCatalog:
+        """The city catalog, indexed from the inline cities list when no catalog file is configured"""
+        if self.catalog is None:
+            self.catalog = CityCatalog.from_configs(self.config['cities'])
+        return self.catalog
+
+    def _create_session(self, pool_size: int) -> requests.Session:
+        """Create an HTTP session whose connection pool fits max in-flight requests"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+        
+    def _request(self, url: str, params: Dict, deadline: Optional[float] = None,
+                 on_send: Optional[Callable[[], None]] = None) -> requests.Response:
+        """GET with timeouts and jittered exponential backoff, bounded by an optional deadline
+        
+        on_send is called each time a request actually goes out, after the
+        rate limiter has let it through.
+        """
+        endpoint = url.rstrip('/').rsplit('/', 1)[-1]
+        attempt = 0
+        while True:
+            attempt += 1
+            if deadline is not None and deadline <= time.monotonic():
+                raise requests.exceptions.Timeout("Collection deadline exceeded")
+            
+            outcome = 'error'
+            try:
+                with self.rate_limiter.slot(deadline):
+                    # Clamped after the wait for a slot, which used up part of the deadline
+                    connect_timeout, read_timeout = self.timeout
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise requests.exceptions.Timeout("Collection deadline exceeded")
+                        read_timeout = min(read_timeout, remaining)
+                        connect_timeout = min(connect_timeout, remaining)
+                    if on_send is not None:
+                        on_send()
+                    started = time.perf_counter()
+                    try:
+                        response = self.session.get(url, params=params, timeout=(connect_timeout, read_timeout))
+                        outcome = str(response.status_code)
+                    finally:
+                        self.telemetry.record_request(endpoint, outcome, time.perf_counter() - started)
+                if response.status_code == 429 or response.status_code >= 500:
+                    response.raise_for_status()
+                return response
+            except TimeoutError as e:
+                # No rate-limit slot before the deadline: waiting longer cannot help
+                raise requests.exceptions.Timeout("Collection deadline exceeded") from e
+            except (requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout,
+                    requests.exceptions.HTTPError):
+                if attempt >= self.max_attempts:
+                    raise
+            
+            # Full jitter: sleep a random fraction of the capped exponential backoff
+            backoff = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+            if deadline is not None and time.monotonic() + backoff >= deadline:
+                raise requests.exceptions.Timeout("Collection deadline exceeded")
+            time.sleep(backoff)
+    
+    def _cache_key(self, endpoint: str, city: str, lat: float, lon: float, **params) -> Optional[str]:
+        """Build the response cache key for a request, if caching is enabled"""
+        if not self.cache:
+            return None
+        return self.cache.make_key(endpoint, city=city, lat=lat, lon=lon, **params)
+    
+    def cache_stats(self) -> Dict:
+        """Return response cache hit/miss counters"""
+        return self.cache.stats() if self.cache else {}
+        
+    def get_current_weather(self, city: str = None, lat: float = None, lon: float = None,
+                            deadline: Optional[float] = None,
+                            on_send: Optional[Callable[[], None]] = None) -> Dict:
         """Get current weather data for a city or coordinates"""
         params = {
             'appid': self.api_key,
@@ -34,20 +152,31 @@ class WeatherAPI:
         else:
             raise ValueError("Either city name or coordinates must be provided")
             
+        cache_key = self._cache_key('weather', city, lat, lon)
+        cached = self.cache.get(cache_key) if self.cache else None
+        if self.cache:
+            self.telemetry.increment('weather_api_cache_total', endpoint='weather',
+                                     result='hit' if cached is not None else 'miss')
+        if cached is not None:
+            return cached
+            
         try:
-            response = requests.get(self.base_url, params=params)
+            response = self._request(self.base_url, params, deadline, on_send)
             response.raise_for_status()
             data = response.json()
             
             # Add timestamp
             data['timestamp'] = datetime.now().isoformat()
+            if self.cache:
+                self.cache.set(cache_key, data)
             return data
             
         except requests.exceptions.RequestException as e:
             print(f"Error fetching weather data: {e}")
             return {}
     
-    def get_forecast(self, city: str = None, lat: float = None, lon: float = None, days: int = 5) -> Dict:
+    def get_forecast(self, city: str = None, lat: float = None, lon: float = None, days: int = 5,
+                     deadline: Optional[float] = None, on_send: Optional[Callable[[], None]] = None) -> Dict:
         """Get weather forecast data"""
         params = {
             'appid': self.api_key,
@@ -63,35 +192,129 @@ class WeatherAPI:
         else:
             raise ValueError("Either city name or coordinates must be provided")
             
+        cache_key = self._cache_key('forecast', city, lat, lon, cnt=params['cnt'])
+        cached = self.cache.get(cache_key) if self.cache else None
+        if self.cache:
+            self.telemetry.increment('weather_api_cache_total', endpoint='forecast',
+                                     result='hit' if cached is not None else 'miss')
+        if cached is not None:
+            return cached
+            
         try:
-            response = requests.get(self.forecast_url, params=params)
+            response = self._request(self.forecast_url, params, deadline, on_send)
             response.raise_for_status()
             data = response.json()
             
             data['timestamp'] = datetime.now().isoformat()
+            if self.cache:
+                self.cache.set(cache_key, data)
             return data
             
         except requests.exceptions.RequestException as e:
             print(f"Error fetching forecast data: {e}")
             return {}
     
-    def get_multiple_cities_weather(self) -> List[Dict]:
-        """Get weather data for all configured cities"""
-        weather_data = []
+    def _fetch_city_weather(self, city_config: Dict, deadline: Optional[float] = None,
+                            on_send: Optional[Callable[[], None]] = None) -> Dict:
+        """Fetch current weather for one configured city"""
+        print(f"Fetching weather for {city_config['name']}...")
         
-        for city_config in self.config['cities']:
-            print(f"Fetching weather for {city_config['name']}...")
-            
-            data = self.get_current_weather(
-                lat=city_config['lat'], 
-                lon=city_config['lon']
-            )
-            
+        data = self.get_current_weather(
+            lat=city_config['lat'], 
+            lon=city_config['lon'],
+            deadline=deadline,
+            on_send=on_send
+        )
+        
+        if data:
+            data['city_config'] = city_config
+        return data
+    
+    def _fetch_city_forecast(self, city_config: Dict, deadline: Optional[float] = None,
+                             on_send: Optional[Callable[[], None]] = None) -> Dict:
+        """Fetch the 5-day / 3-hour forecast for one configured city"""
+        data = self.get_forecast(
+            lat=city_config['lat'],
+            lon=city_config['lon'],
+            days=self.config.get('forecast', {}).get('days', 5),
+            deadline=deadline,
+            on_send=on_send
+        )
+        
+        if data:
+            data['city_config'] = city_config
+        return data
+    
+    def _fetch_sequential(self, fetch: Callable[..., Dict], cities: List[Dict],
+                          deadline: Optional[float]) -> Tuple[List[Dict], List[str]]:
+        """Fetch cities one at a time until the deadline; returns (results, names of cities not reached)"""
+        results = []
+        for position, city in enumerate(cities):
+            if deadline is not None and time.monotonic() >= deadline:
+                return results, [missed['name'] for missed in cities[position:]]
+            data = fetch(city, deadline)
             if data:
-                data['city_config'] = city_config
-                weather_data.append(data)
-                
-            time.sleep(1)  # Rate limiting
-            
+                results.append(data)
+        return results, []
+    
+    @timed('api')
+    def get_multiple_cities_forecast(self, concurrent: Optional[bool] = None) -> List[Dict]:
+        """Get forecasts for all configured cities, within a collection deadline of their own"""
+        if concurrent is None:
+            concurrent = self.concurrent
+        cities = self.config['cities']
+        collection = self.config['api'].get('collection', {})
+        
+        if concurrent and len(cities) > 1:
+            collector = DeadlineCollector(
+                self._fetch_city_forecast,
+                max_workers=self.rate_limiter.max_in_flight,
+                deadline=collection.get('deadline'),
+                hedge_after=collection.get('hedge_after')
+            )
+            result = collector.collect(cities)
+            forecasts = result.completed
+            if result.missed:
+                print(f"Forecast deadline missed for {len(result.missed)} cities: {', '.join(result.missed)}")
+        else:
+            deadline = time.monotonic() + collection['deadline'] if collection.get('deadline') else None
+            forecasts, missed = self._fetch_sequential(self._fetch_city_forecast, cities, deadline)
+            if missed:
+                print(f"Forecast deadline missed for {len(missed)} cities: {', '.join(missed)}")
+        
+        self.telemetry.record_count('api', 'get_multiple_cities_forecast', len(forecasts))
+        return forecasts
+    
+    @timed('api')
+    def get_multiple_cities_weather(self, concurrent: Optional[bool] = None,
+                                    cities: Optional[List[Dict]] = None) -> List[Dict]:
+        """Get weather data for all configured cities, or the given subset of them"""
+        if concurrent is None:
+            concurrent = self.concurrent
+        if cities is None:
+            cities = self.config['cities']
+        collection = self.config['api'].get('collection', {})
+        
+        if concurrent and len(cities) > 1:
+            # The rate limiter bounds both request rate and in-flight requests
+            collector = DeadlineCollector(
+                self._fetch_city_weather,
+                max_workers=self.rate_limiter.max_in_flight,
+                deadline=collection.get('deadline'),
+                hedge_after=collection.get('hedge_after')
+            )
+            result = collector.collect(cities)
+            weather_data = result.completed
+            self.last_missed_cities = result.missed
+            if result.missed:
+                print(f"Collection deadline missed for {len(result.missed)} cities: {', '.join(result.missed)}")
+        else:
+            deadline = time.monotonic() + collection['deadline'] if collection.get('deadline') else None
+            weather_data, self.last_missed_cities = self._fetch_sequential(self._fetch_city_weather, cities, deadline)
+            if self.last_missed_cities:
+                print(f"Collection deadline missed for {len(self.last_missed_cities)} cities: "
+                      f"{', '.join(self.last_missed_cities)}")
+        
+        self.telemetry.record_count('api', 'get_multiple_cities_weather', len(weather_data))
         return weather_data
 ```
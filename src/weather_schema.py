@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class Field:
+    """A DataFrame column extracted from a JSON path in an API payload
+
+    dtype is one of 'float', 'int', 'str', 'epoch' (unix seconds) or 'isotime'.
+    """
+    name: str
+    path: Tuple[Any, ...]
+    dtype: str = 'float'
+    default: Any = None
+
+
+# Measurement fields shared by current weather payloads and forecast list entries
+MEASUREMENT_FIELDS = (
+    Field('temperature', ('main', 'temp')),
+    Field('feels_like', ('main', 'feels_like')),
+    Field('humidity', ('main', 'humidity'), 'int'),
+    Field('pressure', ('main', 'pressure'), 'int'),
+    Field('visibility', ('visibility',), 'int'),
+    Field('wind_speed', ('wind', 'speed')),
+    Field('wind_direction', ('wind', 'deg'), 'int'),
+    Field('cloudiness', ('clouds', 'all'), 'int'),
+    Field('weather_main', ('weather', 0, 'main'), 'str'),
+    Field('weather_description', ('weather', 0, 'description'), 'str'),
+)
+
+CURRENT_WEATHER_SCHEMA = (
+    Field('timestamp', ('timestamp',), 'isotime'),
+    Field('city', ('name',), 'str', 'Unknown'),
+    Field('country', ('sys', 'country'), 'str', 'Unknown'),
+    Field('latitude', ('coord', 'lat')),
+    Field('longitude', ('coord', 'lon')),
+    *MEASUREMENT_FIELDS,
+    Field('sunrise', ('sys', 'sunrise'), 'epoch'),
+    Field('sunset', ('sys', 'sunset'), 'epoch'),
+)
+
+FORECAST_SCHEMA = (
+    Field('forecast_time', ('dt',), 'epoch'),
+    *MEASUREMENT_FIELDS,
+    Field('precipitation_probability', ('pop',)),
+)
+
+_OBJECT_DTYPES = ('str', 'isotime')
+
+
+@lru_cache(maxsize=None)
+def _compile_extractor(schema: Tuple[Field, ...]) -> Callable:
+    """Build a function that fills one preallocated array per field in a single pass
+
+    The JSON paths are checked and split once per schema, so a record costs
+    one try block per field instead of a chain of .get() calls and a dict
+    build. Missing or mistyped values leave the prefilled default (or NaN) in place.
+    """
+    paths = []
+    for field in schema:
+        if not all(isinstance(key, (str, int)) for key in field.path):
+            raise ValueError(f"Unsupported path for field {field.name!r}: {field.path!r}")
+        paths.append(tuple(field.path))
+
+    def _extract(records, *columns):
+        targets = list(zip(paths, columns))
+        for i, r in enumerate(records):
+            for path, column in targets:
+                try:
+                    value = r
+                    for key in path:
+                        value = value[key]
+                    column[i] = value
+                except (KeyError, IndexError, TypeError, ValueError):
+                    pass
+
+    return _extract
+
+
+def extract_columns(records: Sequence[Dict], schema: Iterable[Field]) -> Dict[str, np.ndarray]:
+    """Extract schema fields from records into preallocated typed arrays in one pass"""
+    schema = tuple(schema)
+    n = len(records)
+
+    arrays = []
+    for field in schema:
+        if field.dtype in _OBJECT_DTYPES:
+            arrays.append(np.full(n, field.default, dtype=object))
+        else:
+            fill = np.nan if field.default is None else field.default
+            arrays.append(np.full(n, fill, dtype=np.float64))
+
+    _compile_extractor(schema)(records, *arrays)
+
+    result = {}
+    for field, array in zip(schema, arrays):
+        # Integer fields stay int64 unless a value is missing, as pandas would infer
+        if field.dtype == 'int' and not np.isnan(array).any():
+            array = array.astype(np.int64)
+        result[field.name] = array
+    return result
+
+
+def build_frame(records: Sequence[Dict], schema: Iterable[Field]) -> pd.DataFrame:
+    """Build a typed DataFrame from records without per-row dicts or dtype inference"""
+    schema = tuple(schema)
+    columns = extract_columns(records, schema)
+
+    data = {}
+    for field in schema:
+        values = columns[field.name]
+        if field.dtype == 'epoch':
+            values = pd.to_datetime(values, unit='s')
+        elif field.dtype == 'isotime':
+            values = pd.to_datetime(values)
+        data[field.name] = values
+    return pd.DataFrame(data, copy=False)
+
+
+def schema_columns(schema: Iterable[Field]) -> List[str]:
+    """Return the column names produced by a schema"""
+    return [field.name for field in schema]